@@ -0,0 +1,342 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from london_housing.instrumentation import max_rss, rss_delta_mb
+
+# Column layout of kaggle_london_house_price_data.csv
+RAW_COLUMNS = [
+    'fullAddress', 'postcode', 'country', 'outcode', 'latitude', 'longitude',
+    'bathrooms', 'bedrooms', 'floorAreaSqM', 'livingRooms', 'tenure', 'propertyType',
+    'currentEnergyRating', 'rentEstimate_lowerPrice', 'rentEstimate_currentPrice',
+    'rentEstimate_upperPrice', 'saleEstimate_lowerPrice', 'saleEstimate_currentPrice',
+    'saleEstimate_upperPrice', 'saleEstimate_confidenceLevel', 'saleEstimate_ingestedAt',
+    'saleEstimate_valueChange.numericChange', 'saleEstimate_valueChange.percentageChange',
+    'saleEstimate_valueChange.saleDate', 'history_date', 'history_price',
+    'history_percentageChange', 'history_numericChange',
+]
+
+# Share of nulls per column in the real data: null count / 282872 rows of the Kaggle file
+# (e.g. bathrooms 51103 / 282872 = 0.181)
+NULL_RATES = {
+    'bathrooms': 0.181, 'bedrooms': 0.093, 'floorAreaSqM': 0.056, 'livingRooms': 0.138,
+    'tenure': 0.022, 'propertyType': 0.0024, 'currentEnergyRating': 0.206,
+    'rentEstimate': 0.0043, 'saleEstimate': 0.0019, 'history_change': 0.432,
+}
+
+TENURES = ['Leasehold', 'Freehold', 'Feudal', 'Shared']
+PROPERTY_TYPES = [
+    'Flat/Maisonette', 'Terrace Property', 'Semi-Detached House', 'Detached House',
+    'Mid Terrace House', 'End Terrace House', 'Purpose Built Flat', 'Converted Flat', 'Bungalow Property',
+]
+CONFIDENCE_LEVELS = ['HIGH', 'MEDIUM', 'LOW']
+
+DEFAULT_ROW_COUNTS = (10000, 100000, 1000000)
+
+
+def generate_raw_data(n_rows, seed=0):
+    # Synthetic listings with the raw schema, value ranges and null rates of the Kaggle file
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows)
+    outcodes = np.char.add('N', (ids % 40).astype(str))
+
+    def with_nulls(values, rate):
+        values = pd.Series(values)
+        return values.mask(rng.random(n_rows) < rate)
+
+    floor_area = np.round(rng.lognormal(4.4, 0.45, n_rows), 1)
+    sale_price = np.round(floor_area * rng.lognormal(9.0, 0.35, n_rows), -3)
+    rent_price = np.round(sale_price / rng.uniform(250, 400, n_rows), -1)
+    percentage_change = np.round(rng.normal(2.0, 8.0, n_rows), 3)
+    sale_missing = rng.random(n_rows) < NULL_RATES['saleEstimate']
+    rent_missing = rng.random(n_rows) < NULL_RATES['rentEstimate']
+    history_missing = rng.random(n_rows) < NULL_RATES['history_change']
+
+    df = pd.DataFrame({
+        'fullAddress': np.char.add(ids.astype(str), ' Some Road, London'),
+        'postcode': np.char.add(outcodes, ' 1AA'),
+        'country': 'England',
+        'outcode': outcodes,
+        'latitude': np.round(rng.uniform(51.30, 51.70, n_rows), 6),
+        'longitude': np.round(rng.uniform(-0.50, 0.30, n_rows), 6),
+        'bathrooms': with_nulls(rng.integers(1, 5, n_rows).astype(float), NULL_RATES['bathrooms']),
+        'bedrooms': with_nulls(rng.integers(1, 7, n_rows).astype(float), NULL_RATES['bedrooms']),
+        'floorAreaSqM': with_nulls(floor_area, NULL_RATES['floorAreaSqM']),
+        'livingRooms': with_nulls(rng.integers(0, 4, n_rows).astype(float), NULL_RATES['livingRooms']),
+        'tenure': with_nulls(rng.choice(TENURES, n_rows, p=[0.6, 0.38, 0.01, 0.01]), NULL_RATES['tenure']),
+        'propertyType': with_nulls(rng.choice(PROPERTY_TYPES, n_rows), NULL_RATES['propertyType']),
+        'currentEnergyRating': with_nulls(rng.choice(list('ABCDEFG'), n_rows), NULL_RATES['currentEnergyRating']),
+        'rentEstimate_lowerPrice': np.where(rent_missing, np.nan, rent_price * 0.9),
+        'rentEstimate_currentPrice': np.where(rent_missing, np.nan, rent_price),
+        'rentEstimate_upperPrice': np.where(rent_missing, np.nan, rent_price * 1.1),
+        'saleEstimate_lowerPrice': np.where(sale_missing, np.nan, sale_price * 0.9),
+        'saleEstimate_currentPrice': np.where(sale_missing, np.nan, sale_price),
+        'saleEstimate_upperPrice': np.where(sale_missing, np.nan, sale_price * 1.1),
+        'saleEstimate_confidenceLevel': pd.Series(rng.choice(CONFIDENCE_LEVELS, n_rows)).mask(sale_missing),
+        'saleEstimate_ingestedAt': '2024-10-07T18:07:46.557Z',
+        'saleEstimate_valueChange.numericChange': np.where(
+            sale_missing, np.nan, np.round(sale_price * percentage_change / 100)),
+        'saleEstimate_valueChange.percentageChange': np.where(sale_missing, np.nan, percentage_change),
+        'saleEstimate_valueChange.saleDate': '2019-06-14',
+        'history_date': '2015-03-20',
+        'history_price': np.round(sale_price / rng.uniform(1.0, 1.6, n_rows), -3),
+        'history_percentageChange': np.where(history_missing, np.nan, np.round(rng.normal(30, 20, n_rows), 2)),
+        'history_numericChange': np.where(history_missing, np.nan, np.round(rng.normal(1e5, 5e4, n_rows))),
+    })
+    return df[RAW_COLUMNS]
+
+def write_raw_csv(csv_file_path, n_rows, seed=0):
+    generate_raw_data(n_rows, seed).to_csv(csv_file_path, index=False)
+    return csv_file_path
+
+
+def measure(stage, func, results):
+    # Wall/CPU time, Python-heap peak (tracemalloc) and process peak RSS growth of one stage
+    rss_before = max_rss()
+    tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        value = func()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_after = max_rss()
+
+    shape = getattr(value, 'shape', None)
+    results.append({
+        'stage': stage,
+        'seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        'peak_mb': round(peak / 2**20, 2),
+        'max_rss_growth_mb': rss_delta_mb(rss_before, rss_after),
+        'rows': int(shape[0]) if shape else None,
+        'cols': int(shape[1]) if shape and len(shape) > 1 else None,
+    })
+    print(f"  {stage:<42} {wall:>9.3f}s  {peak / 2**20:>9.1f} MB")
+    return value
+
+
+def run_benchmark(n_rows, work_dir, seed=0, cluster_sample=10000, stages=None):
+    from london_housing import json_convert as jc
+    from london_housing.data_cache import build_cache
+    from london_housing.features import to_dense
+    from london_housing.ingest import ingest_csv
+    from london_housing.kmeans import OptimizedKMeansClustering
+    from london_housing.agnes import AGNESClustering
+    from london_housing.dbscan import DBSCANClustering
+    from london_housing.eclat import Eclat
+    from sklearn.cluster import AgglomerativeClustering, DBSCAN, MiniBatchKMeans
+    from sklearn.decomposition import PCA
+
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+
+    def step(stage, func):
+        if stages is None or any(stage.startswith(prefix) for prefix in stages):
+            return measure(stage, func, results)
+        return func()
+
+    def path(name):
+        return os.path.join(work_dir, name)
+
+    print(f"{n_rows} rows ({work_dir})")
+    raw_csv = step('generate_raw_data', lambda: write_raw_csv(path('raw.csv'), n_rows, seed))
+
+    # json_convert, one wrapper per cleaning step as in the original script ...
+    step('json_convert.csv_to_json', lambda: jc.csv_to_json(raw_csv, path('step_0.json')))
+    step('json_convert.drop_features', lambda: jc.drop_features(
+        path('step_0.json'), path('step_1.json'), jc.FEATURES_TO_DROP))
+    step('json_convert.remove_null_floor_area', lambda: jc.remove_null_floor_area(
+        path('step_1.json'), path('step_2.json')))
+    step('json_convert.replace_null_values', lambda: jc.replace_null_values(
+        path('step_2.json'), path('step_3.json')))
+    step('json_convert.remove_null_rent_estimate', lambda: jc.remove_null_rent_estimate(
+        path('step_3.json'), path('step_4.json')))
+    step('json_convert.json_to_csv', lambda: jc.json_to_csv(path('step_4.json'), path('step_4.csv')))
+    for index in range(5):
+        os.remove(path(f'step_{index}.json'))
+    os.remove(path('step_4.csv'))
+
+    # ... and the single streaming pass that replaces them
+    clean_json = path('final_clean_data.json')
+    step('json_convert.run_pipeline', lambda: jc.run_pipeline(
+        jc.read_csv_rows(raw_csv), jc.cleaning_stages(),
+        json_file_path=clean_json, csv_file_path=path('final_clean_data.csv')))
+    step('data_cache.build_cache', lambda: build_cache(clean_json))
+
+    # The parallel typed parse of the same raw file, straight to the columns the cache holds
+    step('ingest.ingest_csv', lambda: ingest_csv(raw_csv)[0])
+
+    # The first preprocess builds the feature matrix cache, the second reads it
+    kmeans = OptimizedKMeansClustering(n_clusters=5)
+    step('kmeans.load_json_data', lambda: kmeans.load_json_data(clean_json))
+    step('kmeans.preprocess_data', kmeans.preprocess_data)
+    agnes = AGNESClustering(n_clusters=4)
+    step('agnes.load_json_data', lambda: agnes.load_json_data(clean_json))
+    step('agnes.preprocess_data', agnes.preprocess_data)
+    dbscan = DBSCANClustering()
+    dbscan_data = step('dbscan.load_data', lambda: dbscan.load_data(clean_json))
+
+    scaled = kmeans.builder.scale(kmeans.matrix)
+    reduced = step('PCA', lambda: PCA(n_components=10).fit_transform(scaled))
+    step('MiniBatchKMeans', lambda: MiniBatchKMeans(
+        n_clusters=5, batch_size=2000, random_state=42, n_init=3).fit(reduced).cluster_centers_)
+
+    # The quadratic stages run on a fixed-size sample so large row counts stay feasible
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(scaled.shape[0], min(cluster_sample, scaled.shape[0]), replace=False)
+    step(f'AgglomerativeClustering[{len(sample)}]', lambda: AgglomerativeClustering(
+        n_clusters=4, linkage='ward').fit_predict(to_dense(scaled[sample])))
+    dbscan_scaled = dbscan.scale_data(dbscan_data)
+    sample = rng.choice(len(dbscan_scaled), min(cluster_sample, len(dbscan_scaled)), replace=False)
+    step(f'DBSCAN[{len(sample)}]', lambda: DBSCAN(eps=0.4, min_samples=10).fit_predict(dbscan_scaled[sample]))
+
+    step('Eclat.run', lambda: Eclat(clean_json, min_support=0.01).run()[0])
+    return results
+
+
+# Cumulative `python -X importtime` budget per module in ms. numpy + pandas alone take
+# about 0.45 s, so modules built on them get 1.2 s; estimators and plotting libraries
+# must not be imported at all by modules listed in LAZY_MODULES
+IMPORT_BUDGET_MS = {
+    'london_housing': 50,
+    'london_housing.json_convert': 100,
+    'london_housing.instrumentation': 100,
+    'london_housing.cluster_service': 400,
+    'london_housing.shared_array': 400,
+    'london_housing.data_cache': 1200,
+    'london_housing.features': 1200,
+    'london_housing.plotting': 1200,
+    'london_housing.kmeans': 1200,
+    'london_housing.agnes': 1200,
+    'london_housing.dbscan': 1200,
+    'london_housing.geo_clustering': 1200,
+    'london_housing.eclat': 1200,
+    'london_housing.fp_growth': 1200,
+    'london_housing.incremental': 1200,
+    'london_housing.profiling': 1200,
+    'london_housing.ingest': 1200,
+    'london_housing.transactions': 1200,
+    'london_housing.association_rules': 1200,
+    'london_housing.model_selection': 1200,
+    'london_housing.evaluation': 1200,
+    'london_housing.consensus': 1200,
+}
+HEAVY_PACKAGES = ('sklearn', 'matplotlib', 'seaborn', 'mlxtend')
+LAZY_MODULES = set(IMPORT_BUDGET_MS)
+
+
+def import_time(module, repeats=3):
+    # Best of `repeats` fresh interpreters: (cumulative ms, top-level packages imported)
+    best, packages = None, set()
+    for _ in range(repeats):
+        stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stderr
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or line.endswith('| imported package'):
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            packages.add(name.strip().split('.')[0])
+            if name.strip() == module:
+                best = min(best, int(cumulative) / 1000) if best is not None else int(cumulative) / 1000
+    return best, packages
+
+def check_import_budget(budgets=IMPORT_BUDGET_MS, repeats=3):
+    rows = []
+    for module, budget in budgets.items():
+        milliseconds, packages = import_time(module, repeats)
+        heavy = sorted(packages.intersection(HEAVY_PACKAGES)) if module in LAZY_MODULES else []
+        rows.append({'module': module, 'ms': round(milliseconds, 1), 'budget_ms': budget,
+                     'heavy_imports': ' '.join(heavy),
+                     'ok': milliseconds <= budget and not heavy})
+    return pd.DataFrame(rows).set_index('module')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(history_path):
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path, mode='r', encoding='utf-8') as history_file:
+        return json.load(history_file)
+
+def append_history(history_path, entry):
+    history = load_history(history_path)
+    history.append(entry)
+    temp_path = history_path + '.tmp'
+    with open(temp_path, mode='w', encoding='utf-8') as history_file:
+        json.dump(history, history_file, indent=1)
+    os.replace(temp_path, history_path)
+
+def compare_with_previous(history, entry):
+    # Ratio against the latest earlier run with the same row count (> 1 means slower)
+    previous = [run for run in history if run['n_rows'] == entry['n_rows'] and run is not entry]
+    current = pd.DataFrame(entry['results']).set_index('stage')[['seconds', 'peak_mb']]
+    if not previous:
+        return current
+    baseline = pd.DataFrame(previous[-1]['results']).set_index('stage')
+    current['previous_seconds'] = baseline['seconds']
+    current['time_ratio'] = (current['seconds'] / current['previous_seconds']).round(2)
+    current['memory_ratio'] = (current['peak_mb'] / baseline['peak_mb']).round(2)
+    return current
+
+
+# Example usage
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Time and memory-profile every pipeline stage on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000],
+                        help=f"row counts to benchmark, e.g. {' '.join(map(str, DEFAULT_ROW_COUNTS))}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cluster-sample", type=int, default=10000,
+                        help="rows used by AgglomerativeClustering and DBSCAN")
+    parser.add_argument("--stages", nargs="+", help="only profile stages starting with these names")
+    parser.add_argument("--work-dir", help="keep generated files here instead of a temporary directory")
+    parser.add_argument("--history", default=os.path.join(current_dir, "benchmark_history.json"))
+    parser.add_argument("--imports", action="store_true",
+                        help="only check import times against IMPORT_BUDGET_MS (exit status 1 when over)")
+    args = parser.parse_args()
+
+    if args.imports:
+        budget = check_import_budget()
+        print(budget.to_string())
+        sys.exit(0 if budget['ok'].all() else 1)
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work_dir = os.path.join(args.work_dir, str(n_rows)) if args.work_dir else temp_dir
+            results = run_benchmark(n_rows, work_dir, seed=args.seed,
+                                    cluster_sample=args.cluster_sample, stages=args.stages)
+
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "n_rows": n_rows,
+            "seed": args.seed,
+            "results": results,
+        }
+        history = load_history(args.history)
+        print(compare_with_previous(history, entry).to_string())
+        append_history(args.history, entry)
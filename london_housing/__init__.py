@@ -0,0 +1,36 @@
+import importlib
+
+# Public names and the module defining each. Submodules are only imported on first
+# attribute access, so `import london_housing` stays cheap for the CLI and pool workers
+_EXPORTS = {
+    'load_frame': 'data_cache',
+    'ensure_cache': 'data_cache',
+    'ingest_csv': 'ingest',
+    'FeatureMatrixBuilder': 'features',
+    'load_feature_matrix': 'features',
+    'OptimizedKMeansClustering': 'kmeans',
+    'AGNESClustering': 'agnes',
+    'DBSCANClustering': 'dbscan',
+    'GeoClustering': 'geo_clustering',
+    'ConsensusClustering': 'consensus',
+    'Eclat': 'eclat',
+    'FPGrowth': 'fp_growth',
+    'ClusterModel': 'cluster_service',
+    'IncrementalClusterer': 'incremental',
+    'profile_clusters': 'profiling',
+    'evaluate_runs': 'evaluation',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,189 @@
+import hashlib
+import numpy as np
+from .data_cache import load_frame
+from .features import encode_frame, memory_report
+from .instrumentation import instrumented
+from .plotting import plot_density, plot_dendrogram
+
+
+def linkage_from_model(model):
+    # Convert a fitted AgglomerativeClustering tree into a SciPy linkage matrix
+    n_samples = len(model.labels_)
+    counts = np.zeros(len(model.children_))
+    for i, merge in enumerate(model.children_):
+        counts[i] = sum(1 if child < n_samples else counts[child - n_samples] for child in merge)
+    return np.column_stack([model.children_, model.distances_, counts]).astype(np.float64)
+
+def cut_linkage(linkage_matrix, n_clusters):
+    # Undo the last n_clusters - 1 merges; relies on merge order rather than on
+    # distances, so it is also exact for the non-monotonic connectivity trees
+    n_samples = len(linkage_matrix) + 1
+    n_merges = max(n_samples - n_clusters, 0)
+    parent = np.arange(2 * n_samples - 1)
+    children = linkage_matrix[:n_merges, :2].astype(np.int64)
+    merged = np.arange(n_samples, n_samples + n_merges)
+    parent[children[:, 0]] = merged
+    parent[children[:, 1]] = merged
+
+    # A parent always has a larger id than its children, so one descending sweep finds the roots
+    root = parent.copy()
+    for node in range(2 * n_samples - 2, -1, -1):
+        root[node] = root[parent[node]]
+    return np.unique(root[:n_samples], return_inverse=True)[1]
+
+
+class AGNESClustering:
+    def __init__(self, n_clusters=3, linkage='ward', connectivity_neighbors=None, birch_threshold=None):
+        from sklearn.cluster import AgglomerativeClustering
+        self.n_clusters = n_clusters
+        self.linkage = linkage
+        # kNN-graph constraint: sparse O(n * k) memory instead of the O(n^2) condensed matrix
+        self.connectivity_neighbors = connectivity_neighbors
+        # BIRCH pre-aggregation: the tree is built over subcluster centroids only
+        self.birch_threshold = birch_threshold
+        self.model = AgglomerativeClustering(n_clusters=self.n_clusters, linkage=self.linkage)
+        self.df = None
+        self.source_path = None
+        self.builder = None
+        self.linkage_matrix = None
+        self.leaf_assignments = None
+        self._linkage_key = None
+        self.memory = None
+        self.cluster_summary = None
+        self.sample_index = None
+
+    @instrumented()
+    def load_json_data(self, json_file_path):
+        self.df = load_frame(json_file_path)
+        self.source_path = json_file_path
+        print(f"Data loaded. DataFrame shape: {self.df.shape}")
+        return self.df
+
+    @instrumented()
+    def preprocess_data(self):
+        # Shared float32 encoding of numeric and categorical columns (cached on disk)
+        matrix, self.builder = encode_frame(self.df, self.source_path)
+        self.memory = memory_report(self.df, matrix)
+        self.df = self.builder.to_frame(matrix)
+
+        print("Data preprocessed with One-Hot Encoding.")
+        print(f"Encoded Data Shape: {self.df.shape}")
+        return self.df
+
+    @instrumented()
+    def reduce_dimensions(self, data, n_components=2):
+        from sklearn.decomposition import PCA
+        pca = PCA(n_components=n_components)
+        reduced_data = pca.fit_transform(data)
+        print(f"Reduced data shape: {reduced_data.shape}")
+        print(f"Explained Variance Ratio: {sum(pca.explained_variance_ratio_)}")
+        return reduced_data
+
+    @instrumented()
+    def compute_linkage(self, data):
+        # The tree is only rebuilt when the data or the tree options change
+        import scipy.cluster.hierarchy as sch
+        from sklearn.cluster import AgglomerativeClustering, Birch
+        from sklearn.neighbors import kneighbors_graph
+
+        data = np.ascontiguousarray(data)
+        key = (self.linkage, self.connectivity_neighbors, self.birch_threshold, data.shape,
+               hashlib.sha1(data.tobytes()).hexdigest())
+        if key == self._linkage_key:
+            return self.linkage_matrix
+
+        if self.birch_threshold is not None:
+            birch = Birch(threshold=self.birch_threshold, n_clusters=None).fit(data)
+            leaves = birch.subcluster_centers_
+            self.leaf_assignments = birch.labels_
+            print(f"BIRCH pre-aggregation: {len(data)} rows -> {len(leaves)} subclusters")
+        else:
+            leaves = data
+            self.leaf_assignments = None
+
+        if self.connectivity_neighbors is not None:
+            connectivity = kneighbors_graph(leaves, n_neighbors=self.connectivity_neighbors, include_self=False)
+            # Only children_/distances_ are read; cutting the full tree at one cluster keeps
+            # sklearn from also labelling every row
+            model = AgglomerativeClustering(n_clusters=1, linkage=self.linkage, connectivity=connectivity,
+                                            compute_full_tree=True, compute_distances=True)
+            self.linkage_matrix = linkage_from_model(model.fit(leaves))
+        else:
+            self.linkage_matrix = sch.linkage(leaves, method=self.linkage)
+
+        self._linkage_key = key
+        return self.linkage_matrix
+
+    def labels_for(self, n_clusters):
+        # Cut the cached tree; no refit is needed for a different number of clusters
+        labels = cut_linkage(self.linkage_matrix, n_clusters)
+        if self.leaf_assignments is not None:
+            labels = labels[self.leaf_assignments]
+        return labels
+
+    @instrumented()
+    def plot_dendrogram(self, data=None, p=30):
+        # Only the top p merged clusters are drawn; every leaf shows its cluster size
+        if data is not None:
+            self.compute_linkage(data)
+        plot_dendrogram(self.linkage_matrix, 'agnes_dendrogram', p=p)
+
+    @instrumented()
+    def fit(self, data):
+        self.compute_linkage(data)
+        return self.labels_for(self.n_clusters)
+
+    @instrumented()
+    def cluster_and_visualize(self, sample_size=10000):
+        # Take a subset for clustering (sample_size=None uses every row; pair it
+        # with connectivity_neighbors or birch_threshold to stay out of O(n^2) memory)
+        if sample_size is None or sample_size >= len(self.df):
+            subset_df = self.df.copy()
+        else:
+            subset_df = self.df.sample(n=sample_size, random_state=42)
+        print(f"Subset Data Shape: {subset_df.shape}")
+
+        # Scale data
+        scaled_data = self.builder.scale(subset_df.values)
+
+        # Reduce dimensions for clustering and visualization
+        reduced_data = self.reduce_dimensions(scaled_data, n_components=2)
+
+        # Cluster on the PCA projection (the linkage is computed once and reused by the dendrogram)
+        labels = self.fit(reduced_data)
+        print("Clustering completed.")
+
+        # Plot dendrogram
+        self.plot_dendrogram()
+
+        # Visualization (Using first 2 PCA components for simplicity)
+        plot_density(reduced_data[:, 0], reduced_data[:, 1], labels, name='agnes_clusters',
+                     title="AGNES Clustering Visualization (First 2 PCA Components)",
+                     xlabel="Principal Component 1", ylabel="Principal Component 2")
+
+        # Analyze each cluster
+        self.sample_index = subset_df.index
+        subset_df['Cluster'] = labels
+        self.cluster_summary = subset_df.groupby('Cluster').mean()
+        print("Cluster Summary:")
+        print(self.cluster_summary)
+
+        return labels
+
+# Usage example
+if __name__ == "__main__":
+    json_file_path = 'final_clean_data.json'
+
+    # Initialize clustering class
+    agnes = AGNESClustering(n_clusters=4, linkage='ward')
+
+    # Load and preprocess data
+    df = agnes.load_json_data(json_file_path)
+    df = agnes.preprocess_data()
+
+    # Perform clustering and visualization
+    labels = agnes.cluster_and_visualize()
+
+    # Labels for other cluster counts come from the same cached linkage
+    for n_clusters in (3, 5, 6):
+        print(f"{n_clusters} clusters: {np.bincount(agnes.labels_for(n_clusters))}")
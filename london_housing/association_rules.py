@@ -0,0 +1,43 @@
+from itertools import combinations
+
+import pandas as pd
+
+
+def generate_rules(frequent_itemsets, n_transactions, min_confidence=0.5, min_lift=None):
+    # frequent_itemsets maps frozenset -> support count; every subset of a
+    # frequent itemset is frequent too, so antecedent counts are always present
+    rules = []
+    for itemset, count in frequent_itemsets.items():
+        if len(itemset) < 2:
+            continue
+        support = count / n_transactions
+        for size in range(1, len(itemset)):
+            for antecedent in map(frozenset, combinations(itemset, size)):
+                consequent = itemset - antecedent
+                confidence = count / frequent_itemsets[antecedent]
+                if confidence < min_confidence:
+                    continue
+                antecedent_support = frequent_itemsets[antecedent] / n_transactions
+                consequent_support = frequent_itemsets[consequent] / n_transactions
+                lift = confidence / consequent_support
+                if min_lift is not None and lift < min_lift:
+                    continue
+                rules.append({
+                    "antecedents": antecedent,
+                    "consequents": consequent,
+                    "antecedent support": antecedent_support,
+                    "consequent support": consequent_support,
+                    "support": support,
+                    "confidence": confidence,
+                    "lift": lift,
+                    "leverage": support - antecedent_support * consequent_support,
+                    "conviction": (
+                        (1 - consequent_support) / (1 - confidence)
+                        if confidence < 1 else float("inf")
+                    ),
+                })
+
+    columns = ["antecedents", "consequents", "antecedent support", "consequent support",
+               "support", "confidence", "lift", "leverage", "conviction"]
+    rules = pd.DataFrame(rules, columns=columns)
+    return rules.sort_values("lift", ascending=False, ignore_index=True)
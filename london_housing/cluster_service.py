@@ -0,0 +1,173 @@
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+MODEL_VERSION = 1
+NULL_VALUES = (None, "", "null")
+
+
+class ClusterModel:
+    # The fitted KMeans pipeline reduced to plain arrays. Scaling and PCA are both affine,
+    # so they fold into one projection: reduced = numeric @ weights + one-hot rows + bias
+    def __init__(self, numeric_columns, categorical_columns, categories, weights, bias, centroids):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.categories = [list(values) for values in categories]
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.centroid_norms = (self.centroids ** 2).sum(axis=1)
+
+        # Row of `weights` for every category value, per categorical column
+        self.category_rows = []
+        offset = len(self.numeric_columns)
+        for values in self.categories:
+            self.category_rows.append({value: offset + i for i, value in enumerate(values)})
+            offset += len(values)
+
+    @classmethod
+    def from_pipeline(cls, kmeans):
+        # kmeans: a fitted OptimizedKMeansClustering (reduce_and_cluster or fit_streaming)
+        builder = kmeans.builder
+        scaler = builder.scaler_
+        components = kmeans.pca.components_.T
+        return cls(
+            builder.numeric_columns_,
+            builder.categorical_columns,
+            [[str(value) for value in builder.categories_[col]] for col in builder.categorical_columns],
+            scaler.scale_[:, None] * components,
+            (scaler.min_ - kmeans.pca.mean_) @ components,
+            kmeans.model.cluster_centers_,
+        )
+
+    def save(self, path):
+        arrays = {f"categories_{i}": np.array(values) for i, values in enumerate(self.categories)}
+        np.savez_compressed(
+            path, version=MODEL_VERSION,
+            numeric_columns=np.array(self.numeric_columns),
+            categorical_columns=np.array(self.categorical_columns),
+            weights=self.weights, bias=self.bias, centroids=self.centroids, **arrays,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data["version"]) != MODEL_VERSION:
+                raise ValueError(f"Unsupported model version {int(data['version'])} in {path}")
+            categorical_columns = data["categorical_columns"].tolist()
+            return cls(
+                data["numeric_columns"].tolist(),
+                categorical_columns,
+                [data[f"categories_{i}"].tolist() for i in range(len(categorical_columns))],
+                data["weights"], data["bias"], data["centroids"],
+            )
+
+    def project(self, listings):
+        # listings: list of dicts as in final_clean_data.json; missing numbers count as 0 and
+        # unseen categories add nothing, exactly like FeatureMatrixBuilder.transform
+        numeric = np.array(
+            [[_to_float(listing.get(col)) for col in self.numeric_columns] for listing in listings],
+            dtype=np.float64,
+        ).reshape(len(listings), len(self.numeric_columns))
+        reduced = numeric @ self.weights[:len(self.numeric_columns)] + self.bias
+        for col, rows in zip(self.categorical_columns, self.category_rows):
+            codes = np.array([rows.get(str(listing.get(col)), -1) for listing in listings], dtype=np.int64)
+            present = np.flatnonzero(codes >= 0)
+            reduced[present] += self.weights[codes[present]]
+        return reduced
+
+    def predict(self, listings):
+        # A single dict gives scalars, a list of dicts gives arrays
+        single = isinstance(listings, dict)
+        reduced = self.project([listings] if single else listings)
+
+        # Squared distances to every centroid via |x|^2 - 2 x.c + |c|^2
+        distances = (reduced ** 2).sum(axis=1)[:, None] - 2 * reduced @ self.centroids.T + self.centroid_norms
+        labels = distances.argmin(axis=1)
+        nearest = np.sqrt(np.maximum(distances[np.arange(len(labels)), labels], 0))
+        if single:
+            return int(labels[0]), float(nearest[0])
+        return labels, nearest
+
+
+def _to_float(value):
+    if value in NULL_VALUES:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _response(model, payload):
+    labels, distances = model.predict(payload)
+    if isinstance(payload, dict):
+        return {"cluster": labels, "distance": distances}
+    return {"cluster": labels.tolist(), "distance": distances.tolist()}
+
+
+def serve_http(model, host="127.0.0.1", port=8000):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/predict":
+                self.send_error(404)
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                body = json.dumps(_response(model, payload)).encode("utf-8")
+                status = 200
+            except (ValueError, TypeError, AttributeError) as error:
+                body = json.dumps({"error": str(error)}).encode("utf-8")
+                status = 400
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving POST http://{host}:{server.server_port}/predict", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def serve_stdio(model, stdin=sys.stdin, stdout=sys.stdout):
+    # One JSON listing (or list of listings) per line in, one JSON answer per line out
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            response = _response(model, json.loads(line))
+        except (ValueError, TypeError, AttributeError) as error:
+            response = {"error": str(error)}
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign listings to KMeans clusters")
+    parser.add_argument("--model", default="kmeans_model.npz")
+    parser.add_argument("--export", metavar="PICKLE",
+                        help="convert a pipeline saved by OptimizedKMeansClustering.save into --model and exit")
+    parser.add_argument("--stdio", action="store_true", help="answer JSON lines on stdin instead of HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.export:
+        from .kmeans import OptimizedKMeansClustering
+        ClusterModel.from_pipeline(OptimizedKMeansClustering.load(args.export)).save(args.model)
+        print(f"Model written to {args.model}")
+    elif args.stdio:
+        serve_stdio(ClusterModel.load(args.model))
+    else:
+        serve_http(ClusterModel.load(args.model), args.host, args.port)
@@ -0,0 +1,318 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .features import load_feature_matrix, to_dense
+from .instrumentation import instrumented
+from .shared_array import SharedArray, attach, single_threaded
+
+# Label of points a run did not see (outside its subsample); DBSCAN noise stays -1
+NOT_SAMPLED = -2
+METHODS = ('kmeans', 'dbscan', 'agnes')
+# Atoms smaller than this are absorbed by a neighbouring atom before merging
+MIN_ATOM_SIZE = 10
+
+
+def _cluster_run(descriptor, method, params, seed, sample_size):
+    from sklearn.cluster import DBSCAN, AgglomerativeClustering, MiniBatchKMeans
+
+    data = attach(descriptor)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(data), sample_size, replace=False)) if sample_size < len(data) else None
+    sample = data if rows is None else data[rows]
+
+    with single_threaded():
+        if method == 'kmeans':
+            # KMeans can assign unseen points, so every run labels every row
+            model = MiniBatchKMeans(random_state=seed, **params).fit(sample)
+            return model.predict(data).astype(np.int32)
+        if method == 'dbscan':
+            sample_labels = DBSCAN(**params).fit_predict(sample)
+        else:
+            sample_labels = AgglomerativeClustering(**params).fit_predict(sample)
+
+    labels = np.full(len(data), NOT_SAMPLED, dtype=np.int32)
+    labels[slice(None) if rows is None else rows] = sample_labels
+    return labels
+
+
+def knn_edges(data, n_neighbors=15):
+    # Undirected kNN pairs (i < j): the only pairs whose co-association is tracked
+    from sklearn.neighbors import NearestNeighbors
+
+    neighbors = NearestNeighbors(n_neighbors=min(n_neighbors + 1, len(data))).fit(data)
+    graph = neighbors.kneighbors_graph(mode='connectivity')
+    graph = sparse.triu(graph + graph.T, k=1).tocoo()
+    return graph.row.astype(np.int64), graph.col.astype(np.int64)
+
+
+def align_labels(labels, reference):
+    # Renames the clusters of one run to the reference clusters they overlap most
+    # (Hungarian assignment on the contingency table); unmatched clusters become -1
+    from scipy.optimize import linear_sum_assignment
+
+    both = (labels >= 0) & (reference >= 0)
+    n_labels, n_reference = labels.max() + 1, reference.max() + 1
+    if not both.any() or n_labels <= 0 or n_reference <= 0:
+        return np.where(labels >= 0, -1, labels)
+    overlap = np.bincount(labels[both] * n_reference + reference[both],
+                          minlength=n_labels * n_reference).reshape(n_labels, n_reference)
+    run_ids, reference_ids = linear_sum_assignment(overlap, maximize=True)
+    mapping = np.full(n_labels, -1, dtype=np.int32)
+    mapping[run_ids] = reference_ids
+    return np.where(labels >= 0, mapping[np.maximum(labels, 0)], labels)
+
+
+def absorb_small_atoms(coassociation, atoms, min_size=MIN_ATOM_SIZE, max_rounds=20):
+    # Points of small atoms join the atom of the neighbour they were clustered with most
+    # often; repeated so chains of small atoms are reached too. Points that never reach
+    # a large atom keep their own. Atom -1 (points left out) stays -1
+    member = atoms >= 0
+    sizes = np.bincount(atoms[member])
+    large = member & (sizes[np.maximum(atoms, 0)] >= min(min_size, sizes.max()))
+    absorbed = np.where(large, atoms, -1)
+    for _ in range(max_rounds):
+        loose = np.flatnonzero(member & (absorbed < 0))
+        if not len(loose):
+            break
+        edges = coassociation[loose].tocoo()
+        valid = (absorbed[edges.col] >= 0) & (edges.data > 0)
+        rows, cols, weights = edges.row[valid], edges.col[valid], edges.data[valid]
+        if not len(rows):
+            break
+        order = np.lexsort((-weights, rows))
+        strongest = order[np.unique(rows[order], return_index=True)[1]]
+        absorbed[loose[rows[strongest]]] = absorbed[cols[strongest]]
+    absorbed = np.where(absorbed >= 0, absorbed, atoms)
+    return _compact(absorbed)
+
+
+def atom_coassociation(runs, atoms, n_atoms):
+    # Exact co-association summed over all point pairs of two atoms: together[a, b] counts
+    # (run, pair) combinations put in one cluster, pairs[a, b] those the run sampled both of
+    together = np.zeros((n_atoms, n_atoms))
+    pairs = np.zeros((n_atoms, n_atoms))
+    member = atoms >= 0
+    for labels in runs:
+        sampled = np.bincount(atoms[member & (labels != NOT_SAMPLED)], minlength=n_atoms).astype(np.float64)
+        clustered = member & (labels >= 0)
+        counts = sparse.coo_matrix((np.ones(clustered.sum()), (atoms[clustered], labels[clustered])),
+                                   shape=(n_atoms, labels.max() + 1)).tocsr()
+        together += (counts @ counts.T).toarray()
+        pairs += np.outer(sampled, sampled)
+    return together, pairs
+
+
+def merge_atoms(together, pairs, threshold):
+    # Average linkage weighted by points: repeatedly merges the two groups whose point
+    # pairs were clustered together most often, until no pair reaches the threshold.
+    # Returns the group of every atom
+    together, pairs = together.copy(), pairs.copy()
+    n_atoms = len(together)
+    score = together / np.maximum(pairs, 1)
+    np.fill_diagonal(score, -np.inf)
+    groups = np.arange(n_atoms)
+    active = np.ones(n_atoms, dtype=bool)
+    while True:
+        first, second = np.unravel_index(score.argmax(), score.shape)
+        if score[first, second] < threshold:
+            break
+        for matrix in (together, pairs):
+            matrix[first] += matrix[second]
+            matrix[:, first] += matrix[:, second]
+        active[second] = False
+        row = np.where(active, together[first] / np.maximum(pairs[first], 1), -np.inf)
+        row[first] = -np.inf
+        score[first] = score[:, first] = row
+        score[second] = score[:, second] = -np.inf
+        groups[groups == second] = first
+    return groups
+
+
+def point_stability(runs, labels):
+    # Per point: mean share of its consensus cluster that a run put in the point's own
+    # cluster, over the runs that sampled the point (noise in a run counts as 0)
+    n_clusters = max(labels.max() + 1, 1)
+    total = np.zeros(len(labels))
+    seen = np.zeros(len(labels), dtype=np.int32)
+    member = labels >= 0
+    for run in runs:
+        sampled = member & (run != NOT_SAMPLED)
+        size = np.bincount(labels[sampled], minlength=n_clusters)
+        clustered = sampled & (run >= 0)
+        shared = sparse.coo_matrix((np.ones(clustered.sum()), (labels[clustered], run[clustered])),
+                                   shape=(n_clusters, run.max() + 1)).tocsr()
+        share = np.zeros(len(labels))
+        share[clustered] = (np.asarray(shared[labels[clustered], run[clustered]]).ravel()
+                            / size[labels[clustered]])
+        total += share
+        seen += sampled
+    return np.where(seen > 0, total / np.maximum(seen, 1), np.nan)
+
+
+class ConsensusClustering:
+    # Many seeds/subsamples of one algorithm, run in parallel over a shared copy of the
+    # data, combined through their co-association into consensus labels with per-point
+    # stability scores. threshold is the share of runs two groups must be clustered
+    # together in to end up in one consensus cluster; atom_threshold the share for two
+    # neighbours to start in the same atom (1.0: no run ever split them)
+    def __init__(self, method='kmeans', n_runs=20, sample_fraction=0.8, max_sample_size=None,
+                 n_neighbors=15, threshold=0.5, atom_threshold=1.0, n_jobs=None, random_state=42,
+                 **params):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        self.method = method
+        self.n_runs = n_runs
+        self.sample_fraction = sample_fraction
+        # AGNES is quadratic in the subsample, so cap it (e.g. 10000)
+        self.max_sample_size = max_sample_size
+        self.n_neighbors = n_neighbors
+        self.threshold = threshold
+        self.atom_threshold = atom_threshold
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.params = params or ({'n_clusters': 5, 'batch_size': 2000} if method == 'kmeans' else {})
+        self.runs_ = None
+        self.labels_ = None
+        self.stability_ = None
+        self.coassociation_ = None
+        self.edge_stability_ = None
+
+    def _sample_size(self, n_points):
+        size = max(int(round(n_points * self.sample_fraction)), 1)
+        if self.max_sample_size is not None:
+            size = min(size, self.max_sample_size)
+        return min(size, n_points)
+
+    @instrumented()
+    def run(self, data):
+        data = np.asarray(data, dtype=np.float32)
+        seeds = np.random.default_rng(self.random_state).integers(0, 2 ** 31 - 1, self.n_runs)
+        sample_size = self._sample_size(len(data))
+        runs = np.empty((self.n_runs, len(data)), dtype=np.int32)
+        with SharedArray(data) as shared, ProcessPoolExecutor(max_workers=self.n_jobs or os.cpu_count()) as pool:
+            futures = [pool.submit(_cluster_run, shared.descriptor, self.method, self.params, int(seed), sample_size)
+                       for seed in seeds]
+            for i, future in enumerate(futures):
+                runs[i] = future.result()
+        return runs
+
+    @instrumented()
+    def coassociate(self, runs, rows, cols):
+        # Share of the runs that sampled both ends of an edge and put them in the same
+        # cluster. Accumulated run by run, so memory is O(edges), never O(n^2)
+        together = np.zeros(len(rows), dtype=np.int32)
+        sampled = np.zeros(len(rows), dtype=np.int32)
+        for labels in runs:
+            first, second = labels[rows], labels[cols]
+            both = (first != NOT_SAMPLED) & (second != NOT_SAMPLED)
+            sampled += both
+            together += both & (first == second) & (first >= 0)
+        weights = together / np.maximum(sampled, 1)
+        n_points = runs.shape[1]
+        matrix = sparse.coo_matrix((weights, (rows, cols)), shape=(n_points, n_points)).tocsr()
+        return matrix + matrix.T
+
+    @instrumented()
+    def consensus_labels(self, runs):
+        # Neighbours no run split form atoms (connected components). Any looser cut
+        # chains clusters together along their borders, where every edge is split by
+        # only a few runs, so atoms are merged afterwards by their exact co-association,
+        # which also links groups the kNN graph never connected
+        from scipy.sparse.csgraph import connected_components
+
+        strong = self.coassociation_ >= self.atom_threshold
+        atoms = connected_components(strong, directed=False)[1]
+        # Points no run ever put in a cluster (always noise or never sampled) stay -1
+        atoms = absorb_small_atoms(self.coassociation_, np.where((runs >= 0).any(axis=0), atoms, -1))
+        n_atoms = atoms.max() + 1
+        together, pairs = atom_coassociation(runs, atoms, n_atoms)
+        groups = merge_atoms(together, pairs, self.threshold)
+        return _compact(np.where(atoms >= 0, groups[atoms], -1))
+
+    @instrumented()
+    def fit(self, data):
+        runs = self.run(data)
+
+        rows, cols = knn_edges(data, self.n_neighbors)
+        self.coassociation_ = self.coassociate(runs, rows, cols)
+        # Mean co-association with the neighbours: low where the point's neighbourhood
+        # keeps being split between clusters, whatever the label names are
+        degree = np.diff(self.coassociation_.indptr)
+        self.edge_stability_ = np.asarray(self.coassociation_.sum(axis=1)).ravel() / np.maximum(degree, 1)
+
+        self.labels_ = self.consensus_labels(runs)
+        self.stability_ = point_stability(runs, self.labels_)
+        # Runs renamed to the consensus clusters, for comparing single runs with the result
+        self.runs_ = np.array([align_labels(labels, self.labels_) for labels in runs])
+        print(f"Consensus of {self.n_runs} {self.method} runs: {self.labels_.max() + 1} clusters, "
+              f"mean stability {np.nanmean(self.stability_):.3f}, "
+              f"mean neighbour co-association {self.edge_stability_.mean():.3f}")
+        return self.labels_
+
+    def summary(self):
+        frame = pd.DataFrame({'cluster': self.labels_, 'stability': self.stability_,
+                              'edge_stability': self.edge_stability_})
+        return frame.groupby('cluster').agg(
+            size=('stability', 'size'),
+            stability=('stability', 'mean'),
+            unstable_share=('stability', lambda values: float((values < 0.5).mean())),
+            edge_stability=('edge_stability', 'mean'),
+        )
+
+
+def _compact(labels):
+    # Consecutive ids, keeping -1 where there is no cluster
+    compact = np.full(len(labels), -1, dtype=np.int64)
+    clustered = labels >= 0
+    compact[clustered] = np.unique(labels[clustered], return_inverse=True)[1]
+    return compact
+
+
+def feature_space(source_path, n_components=10, random_state=42):
+    # The space OptimizedKMeansClustering clusters in: scaled features reduced by PCA
+    from sklearn.decomposition import PCA
+
+    matrix, builder = load_feature_matrix(source_path)
+    scaled = to_dense(builder.scale(matrix[:]))
+    return PCA(n_components=n_components, random_state=random_state).fit_transform(scaled).astype(np.float32)
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Consensus clustering over many seeds and subsamples")
+    parser.add_argument("--data", default=os.path.join(project_dir, "final_clean_data.json"))
+    parser.add_argument("--method", choices=METHODS, default="kmeans")
+    parser.add_argument("--n-clusters", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sample-fraction", type=float, default=0.8)
+    parser.add_argument("--max-sample-size", type=int, help="cap per run (use with --method agnes)")
+    parser.add_argument("--eps", type=float, default=0.4, help="DBSCAN radius")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="share of runs two groups must share a cluster in to be merged")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--output", default="consensus_labels.csv")
+    args = parser.parse_args()
+
+    if args.method == "kmeans":
+        params = {"n_clusters": args.n_clusters, "batch_size": 2000}
+    elif args.method == "dbscan":
+        params = {"eps": args.eps, "min_samples": 10}
+    else:
+        params = {"n_clusters": args.n_clusters, "linkage": "ward"}
+
+    data = feature_space(args.data)
+    consensus = ConsensusClustering(args.method, n_runs=args.runs, sample_fraction=args.sample_fraction,
+                                    max_sample_size=args.max_sample_size, threshold=args.threshold,
+                                    n_jobs=args.jobs, **params)
+    labels = consensus.fit(data)
+    print(consensus.summary())
+    pd.DataFrame({"row": np.arange(len(labels)), "cluster": labels,
+                  "stability": consensus.stability_}).to_csv(args.output, index=False)
+    print(f"Labels written to {args.output}")
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+REJECTED_NAME = 'rejected_rows.csv'
+CATEGORICAL_COLUMNS = ['tenure', 'propertyType', 'saleEstimate_confidenceLevel']
+
+
+def default_cache_dir(source_path):
+    # final_clean_data.json -> final_clean_data_cache/
+    return os.path.splitext(os.path.abspath(source_path))[0] + '_cache'
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_source(source_path):
+    if source_path.endswith('.json'):
+        with open(source_path, mode='r', encoding='utf-8') as json_file:
+            df = pd.DataFrame(json.load(json_file))
+    else:
+        # Raw listings are typed and cleaned while parsing; the rejects travel with the frame
+        from .ingest import SCHEMA, ingest_csv, read_header
+        header, _ = read_header(source_path)
+        if all(name in header for name in SCHEMA):
+            df, rejected = ingest_csv(source_path)
+            df.attrs['rejected'] = rejected
+            return df
+        df = pd.read_csv(source_path)
+    return type_columns(df)
+
+def type_columns(df):
+    # The cleaned JSON keeps every value as a string, so type the columns here once;
+    # categorical strings become category codes instead of one Python object per cell
+    for col in df.columns:
+        if col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].replace('', np.nan).astype('category')
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def build_cache(source_path, cache_dir=None, source_hash=None, df=None):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    if df is None:
+        df = read_source(source_path)
+    rejected = df.attrs.get('rejected')
+    if rejected is not None:
+        rejected.to_csv(os.path.join(cache_dir, REJECTED_NAME), index=False)
+    columns = []
+    for i, col in enumerate(df.columns):
+        file_name = f'col_{i:03d}.npy'
+        if col in CATEGORICAL_COLUMNS:
+            values = df[col]
+            np.save(os.path.join(cache_dir, file_name), values.cat.codes.to_numpy())
+            columns.append({'name': col, 'kind': 'categorical', 'file': file_name,
+                            'categories': [str(c) for c in values.cat.categories]})
+        else:
+            np.save(os.path.join(cache_dir, file_name), df[col].to_numpy(dtype='float64'))
+            columns.append({'name': col, 'kind': 'numeric', 'file': file_name})
+
+    stat = os.stat(source_path)
+    manifest = {
+        'version': CACHE_VERSION,
+        'source': os.path.basename(source_path),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_hash': source_hash or file_hash(source_path),
+        'n_rows': len(df),
+        'n_rejected': None if rejected is None else int(rejected['line'].nunique()),
+        'columns': columns,
+    }
+    _write_manifest(cache_dir, manifest)
+    print(f"Cache written to {cache_dir} ({len(df)} rows, {len(columns)} columns)")
+    return manifest
+
+def read_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, mode='r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_manifest(cache_dir, manifest):
+    # Written last and atomically so a half-built cache is never picked up
+    tmp_path = os.path.join(cache_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, mode='w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_NAME))
+
+def ensure_cache(source_path, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    manifest = read_manifest(cache_dir)
+    if manifest is None or manifest.get('version') != CACHE_VERSION:
+        return build_cache(source_path, cache_dir)
+
+    stat = os.stat(source_path)
+    if stat.st_size != manifest['source_size']:
+        return build_cache(source_path, cache_dir)
+    if stat.st_mtime_ns == manifest['source_mtime_ns']:
+        return manifest
+
+    # Same size but touched: only the content hash decides whether it is stale
+    source_hash = file_hash(source_path)
+    if source_hash != manifest['source_hash']:
+        return build_cache(source_path, cache_dir, source_hash=source_hash)
+    manifest['source_mtime_ns'] = stat.st_mtime_ns
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+def load_column(cache_dir, column):
+    # Copy-on-write mapping: pages are read lazily and in-place edits never reach the cache
+    values = np.load(os.path.join(cache_dir, column['file']), mmap_mode='c')
+    if column['kind'] == 'categorical':
+        return pd.Categorical.from_codes(values, categories=column['categories'])
+    return values
+
+def load_frame(source_path, columns=None, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    manifest = ensure_cache(source_path, cache_dir)
+
+    selected = [c for c in manifest['columns'] if columns is None or c['name'] in columns]
+    return pd.DataFrame({c['name']: load_column(cache_dir, c) for c in selected}, copy=False)
+
+def iter_chunks(source_path, chunk_size=20000, columns=None, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    manifest = ensure_cache(source_path, cache_dir)
+    selected = [c for c in manifest['columns'] if columns is None or c['name'] in columns]
+    mapped = {c['name']: np.load(os.path.join(cache_dir, c['file']), mmap_mode='r') for c in selected}
+
+    # Evenly sized chunks, so no trailing chunk is too small for incremental estimators
+    n_rows = manifest['n_rows']
+    n_chunks = max(1, -(-n_rows // chunk_size))
+    bounds = np.linspace(0, n_rows, n_chunks + 1).astype(np.int64)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        chunk = {}
+        for column in selected:
+            values = np.array(mapped[column['name']][start:stop])
+            if column['kind'] == 'categorical':
+                values = pd.Categorical.from_codes(values, categories=column['categories'])
+            chunk[column['name']] = values
+        yield pd.DataFrame(chunk, index=pd.RangeIndex(start, stop), copy=False)
+
+
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    build_cache(os.path.join(project_dir, 'final_clean_data.json'))
@@ -0,0 +1,185 @@
+import pandas as pd
+import numpy as np
+from .data_cache import CATEGORICAL_COLUMNS, load_frame
+from .instrumentation import instrumented
+from .plotting import plot_density
+
+class DBSCANClustering:
+    def __init__(self, eps=None, min_samples=10, max_graph_edges=50_000_000):
+        self.df = None
+        # None: eps k-uzaklık eğrisinden önerilir
+        self.eps = eps
+        self.min_samples = min_samples
+        # Komşuluk grafı için üst sınır (kenar başına ~12 bayt); tekrarlı fiyatlarda
+        # büyük bir eps grafı O(n^2) kenara çıkarabilir
+        self.max_graph_edges = max_graph_edges
+        # Komşuluk indeksi ve grafı bir kez kurulur, her denemede yeniden kullanılır
+        self.neighbors = None
+        self.neighbor_graph = None
+        self.graph_radius = None
+        self._index_data = None
+        self.cluster_summary = None
+        self.sample_index = None
+
+    @instrumented()
+    def load_data(self, file_name):
+        # Tipli önbellekten oku (sayısal sütunlar zaten float)
+        df = load_frame(file_name)
+        print(f"Loaded Data Shape: {df.shape}")  # Verinin şekline bakın
+
+        # Kategorik sütunları geçici olarak çıkar
+        df = df.drop(columns=CATEGORICAL_COLUMNS)
+
+        # Eksik verileri at
+        df = df.dropna()  # NaN olan satırları sil
+
+        print(f"Cleaned Data Shape: {df.shape}")  # Temizlenmiş verinin şekli
+        return df
+
+    @instrumented()
+    def scale_data(self, data):
+        # Veriyi standartlaştır
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        scaled_data = scaler.fit_transform(data)
+        return scaled_data
+
+    @instrumented()
+    def reduce_dimensions(self, data, n_components=2):
+        # Veriyi PCA ile 2 boyuta indir
+        from sklearn.decomposition import PCA
+        pca = PCA(n_components=n_components)
+        reduced_data = pca.fit_transform(data)
+        return reduced_data
+
+    def build_index(self, data):
+        # KD-tree indeksi (eps önerisi ve komşuluk grafı aynı indeksi kullanır)
+        if self.neighbors is None or self._index_data is not data:
+            from sklearn.neighbors import NearestNeighbors
+            self.neighbors = NearestNeighbors(algorithm='kd_tree').fit(data)
+            self._index_data = data
+            self.neighbor_graph = None
+            self.graph_radius = None
+        return self.neighbors
+
+    @instrumented()
+    def build_neighbor_graph(self, data, radius):
+        # En büyük eps için seyrek uzaklık grafı; daha küçük eps değerleri aynı grafı süzer
+        self.build_index(data)
+        if self.neighbor_graph is None or self.graph_radius < radius:
+            self.check_graph_size(data, radius)
+            self.neighbor_graph = self.neighbors.radius_neighbors_graph(
+                data, radius=radius, mode='distance', sort_results=True
+            )
+            self.graph_radius = radius
+            print(f"Neighbor graph built: radius={radius}, edges={self.neighbor_graph.nnz}")
+        return self.neighbor_graph
+
+    def check_graph_size(self, data, radius, n_probe=1000):
+        # Rastgele noktaların komşu sayısından kenar sayısını tahmin et; sınırı aşarsa
+        # grafı kurmadan önce açık bir hata ver
+        rng = np.random.default_rng(0)
+        probe = rng.choice(len(data), min(n_probe, len(data)), replace=False)
+        counts = self.neighbors.radius_neighbors(data[probe], radius=radius, return_distance=False)
+        estimate = int(np.mean([len(c) for c in counts]) * len(data))
+        if estimate > self.max_graph_edges:
+            raise ValueError(
+                f"Neighbor graph for eps={radius} would hold about {estimate:,} edges "
+                f"(max_graph_edges={self.max_graph_edges:,}); use a smaller eps or sample_size"
+            )
+        return estimate
+
+    @instrumented()
+    def suggest_eps(self, data, min_samples=None):
+        # k-uzaklık eğrisinin dirsek noktası (eğriye en uzak kiriş noktası)
+        min_samples = self.min_samples if min_samples is None else min_samples
+        self.build_index(data)
+        distances, _ = self.neighbors.kneighbors(data, n_neighbors=min_samples)
+        k_distances = np.sort(distances[:, -1])
+
+        x = np.linspace(0, 1, len(k_distances))
+        span = k_distances[-1] - k_distances[0]
+        y = (k_distances - k_distances[0]) / span if span > 0 else x
+        eps = float(k_distances[np.argmax(x - y)])
+        print(f"Suggested eps for min_samples={min_samples}: {eps:.4f}")
+        return eps
+
+    @instrumented()
+    def fit(self, data, eps=None, min_samples=None):
+        # DBSCAN algoritması ile kümeleme yap (önceden hesaplanmış komşuluk grafı üzerinde)
+        eps = self.eps if eps is None else eps
+        min_samples = self.min_samples if min_samples is None else min_samples
+        # Ne argüman ne de kurucu eps verdiyse k-uzaklık eğrisinden öner
+        if eps is None:
+            eps = self.suggest_eps(data, min_samples)
+        graph = self.build_neighbor_graph(data, eps)
+        from sklearn.cluster import DBSCAN
+        dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed')
+        labels = dbscan.fit_predict(graph)
+        return labels
+
+    @instrumented()
+    def sweep(self, data, eps_values, min_samples_values):
+        # Tüm eps/min_samples ızgarası için graf yalnızca bir kez kurulur
+        self.build_neighbor_graph(data, max(eps_values))
+        results = []
+        labels_by_params = {}
+        for eps in eps_values:
+            for min_samples in min_samples_values:
+                labels = self.fit(data, eps=eps, min_samples=min_samples)
+                labels_by_params[(eps, min_samples)] = labels
+                results.append({
+                    'eps': eps,
+                    'min_samples': min_samples,
+                    'n_clusters': len(set(labels)) - (1 if -1 in labels else 0),
+                    'noise_ratio': float(np.mean(labels == -1)),
+                })
+        return pd.DataFrame(results), labels_by_params
+
+    @instrumented()
+    def cluster_and_visualize(self, file_name, sample_size=None, eps=None):
+        # Veriyi yükle
+        self.df = self.load_data(file_name)
+
+        # Verinin büyüklüğünü kontrol et
+        if len(self.df) == 0:
+            raise ValueError("Dataframe is empty. Check the data loading process.")
+
+        # Yeni özellikler seç (rentEstimate_currentPrice, saleEstimate_currentPrice, floorAreaSqM)
+        features = ['rentEstimate_currentPrice', 'saleEstimate_currentPrice', 'floorAreaSqM']
+        subset_df = self.df[features]
+
+        # Subset al (varsayılan tüm veri; komşuluk grafı check_graph_size ile sınırlı)
+        if sample_size is not None:
+            subset_df = subset_df.sample(n=min(sample_size, len(subset_df)), random_state=42)
+        print(f"Subset Data Shape: {subset_df.shape}")
+
+        # Veriyi ölçeklendir
+        scaled_data = self.scale_data(subset_df.values)
+
+        # Boyutları indir
+        reduced_data = self.reduce_dimensions(scaled_data, n_components=2)
+
+        # DBSCAN ile kümeleme yap (eps yoksa fit önerir)
+        labels = self.fit(scaled_data, eps=eps)
+        print("Clustering completed.")
+
+        # DBSCAN sonucunu görselleştir
+        plot_density(reduced_data[:, 0], reduced_data[:, 1], labels, name='dbscan_clusters',
+                     title="DBSCAN Clustering Visualization (First 2 PCA Components)",
+                     xlabel="Principal Component 1", ylabel="Principal Component 2")
+
+        # Her küme için istatistiksel analiz
+        subset_df = subset_df.copy()
+        self.sample_index = subset_df.index
+        subset_df['Cluster'] = labels
+        self.cluster_summary = subset_df.groupby('Cluster').mean()
+        print("Cluster Summary:")
+        print(self.cluster_summary)
+
+        return labels
+
+# Uygulama kısmı
+if __name__ == "__main__":
+    visualization = DBSCANClustering()
+    labels = visualization.cluster_and_visualize('final_clean_data.json')
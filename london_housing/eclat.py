@@ -0,0 +1,150 @@
+import os
+from .association_rules import generate_rules
+from .data_cache import load_frame
+from .instrumentation import instrumented
+from .plotting import finish_figure
+from .transactions import TransactionEncoder, TransactionMatrix
+
+
+class Eclat:
+    def __init__(self, json_file_path, min_support=0.01, max_length=None, use_diffsets=False):
+        self.json_file_path = json_file_path
+        self.min_support = min_support
+        self.max_length = max_length
+        # Diffsets shrink the bitmaps on dense data, where most tids are shared
+        self.use_diffsets = use_diffsets
+
+    @instrumented()
+    def load_transactions(self):
+        df = load_frame(self.json_file_path, columns=["bedrooms", "tenure", "propertyType"])
+
+        # Shared CSR encoder: items like "bedrooms_3" or "tenure_Freehold" as integer ids
+        encoder = TransactionEncoder(categorical_columns=["bedrooms", "tenure", "propertyType"])
+        return encoder.fit_transform(df)
+
+    def build_tidsets(self, transactions):
+        # Vertical layout: one Python int bitmap per item, bit t set if transaction t has it
+        if not isinstance(transactions, TransactionMatrix):
+            transactions = TransactionMatrix.from_lists(transactions)
+        return {
+            transactions.item_names[item]: bits
+            for item, bits in transactions.tidsets().items()
+        }
+
+    @instrumented()
+    def get_frequent_itemsets(self, transactions):
+        min_count = self.min_support * len(transactions)
+        tidsets = self.build_tidsets(transactions)
+
+        # Frequent 1-itemsets, least frequent first to keep intersections small
+        items = [(item, tids, tids.bit_count()) for item, tids in tidsets.items()]
+        items = sorted(
+            (entry for entry in items if entry[2] >= min_count), key=lambda entry: entry[2]
+        )
+
+        frequent_itemsets = {}
+        self._mine((), items, min_count, frequent_itemsets, diffsets=False)
+        return frequent_itemsets
+
+    def _mine(self, prefix, items, min_count, frequent_itemsets, diffsets):
+        # Depth-first search over the equivalence class sharing `prefix`. Each entry
+        # holds a tid-set bitmap, or a diffset (tids of the prefix missing the item)
+        for i, (item, bits, support) in enumerate(items):
+            itemset = prefix + (item,)
+            frequent_itemsets[frozenset(itemset)] = support
+            if self.max_length is not None and len(itemset) >= self.max_length:
+                continue
+
+            extensions = []
+            for other, other_bits, _ in items[i + 1:]:
+                if diffsets:
+                    # d(PXY) = d(PY) - d(PX)
+                    new_bits = other_bits & ~bits
+                    new_support = support - new_bits.bit_count()
+                elif self.use_diffsets:
+                    # Switch from tid-sets to diffsets: d(XY) = t(X) - t(Y)
+                    new_bits = bits & ~other_bits
+                    new_support = support - new_bits.bit_count()
+                else:
+                    new_bits = bits & other_bits
+                    new_support = new_bits.bit_count()
+                if new_support >= min_count:
+                    extensions.append((other, new_bits, new_support))
+
+            if extensions:
+                self._mine(itemset, extensions, min_count, frequent_itemsets,
+                           diffsets or self.use_diffsets)
+
+    @instrumented()
+    def generate_rules(self, frequent_itemsets, transactions, min_confidence=0.5):
+        return generate_rules(frequent_itemsets, len(transactions), min_confidence=min_confidence)
+
+    def plot_top_frequent_itemsets(self, frequent_itemsets, top_n=20):
+
+        # Convert frequent itemsets to a sorted list of tuples
+        sorted_itemsets = sorted(
+            frequent_itemsets.items(), key=lambda x: x[1], reverse=True
+        )[:top_n]
+
+        # Prepare data for plotting
+        labels = [" + ".join(map(str, itemset)) for itemset, _ in sorted_itemsets]
+        support_values = [support for _, support in sorted_itemsets]
+
+        # Plotting (matplotlib and seaborn only load when a plot is drawn)
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        plt.figure(figsize=(10, 6))
+        sns.barplot(x=support_values, y=labels, palette="viridis")
+        plt.title(f"Top {top_n} Frequent Itemsets", fontsize=14)
+        plt.xlabel("Support")
+        plt.ylabel("Itemsets")
+        plt.xticks(rotation=90, fontsize=8)
+        plt.tight_layout()
+        finish_figure("eclat_top_itemsets")
+
+    def plot_support(self, frequent_itemsets, transactions):
+        items = list(frequent_itemsets.keys())
+        supports = [frequent_itemsets[item] / len(transactions) for item in items]
+
+        import matplotlib.pyplot as plt
+        plt.figure(figsize=(10, 6))
+        plt.bar(
+            range(len(items)), supports, tick_label=[" + ".join(sorted(item)) for item in items]
+        )
+        plt.xlabel("Itemsets")
+        plt.ylabel("Support")
+        plt.title("Support of Frequent Itemsets")
+        plt.xticks(rotation=90, fontsize=8)
+        plt.tight_layout()
+        finish_figure("eclat_support")
+
+    @instrumented(shape=lambda result: (len(result[1]), result[1].n_items))
+    def run(self):
+        transactions = self.load_transactions()
+        frequent_itemsets = self.get_frequent_itemsets(transactions)
+        return frequent_itemsets, transactions
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    json_file = os.path.join(project_dir, "final_clean_data.json")
+    min_support = 0.01
+
+    eclat = Eclat(json_file, min_support)
+    frequent_itemsets, transactions = eclat.run()
+
+    print("Frequent Itemsets:")
+    for itemset, support in frequent_itemsets.items():
+        print(f"{set(itemset)}: {support}")
+
+    # Association rules from the mined itemsets
+    rules = eclat.generate_rules(frequent_itemsets, transactions, min_confidence=0.5)
+    print("Association Rules:")
+    print(rules)
+
+    # Plot frequent itemsets
+    eclat.plot_top_frequent_itemsets(frequent_itemsets)
+
+    # Plot support values
+    eclat.plot_support(frequent_itemsets, transactions)
@@ -0,0 +1,162 @@
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .features import load_feature_matrix, to_dense
+from .instrumentation import instrumented
+
+NOISE_LABEL = -1
+
+
+def stratified_sample(labels, sample_size, strategy='proportional', random_state=42):
+    # 'proportional' keeps the cluster mix, 'equal' draws the same number from every
+    # cluster so small clusters still get a usable estimate
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    if strategy == 'equal':
+        quotas = np.minimum(counts, max(sample_size // len(clusters), 1))
+    else:
+        quotas = np.maximum(np.round(counts * min(sample_size / len(labels), 1)).astype(np.int64), 1)
+    order = np.argsort(labels, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    picks = [rng.choice(order[bounds[i]:bounds[i + 1]], quota, replace=False) for i, quota in enumerate(quotas)]
+    return np.sort(np.concatenate(picks))
+
+
+@instrumented()
+def silhouette_for(data, labels, indices, working_memory=256):
+    # Exact silhouette of the points in `indices` against every row of `data`. Distances
+    # are produced a block of rows at a time (working_memory MB) and immediately reduced
+    # to per-cluster sums, so memory never grows with len(data)
+    from sklearn.metrics import pairwise_distances_chunked
+
+    clusters, codes = np.unique(labels, return_inverse=True)
+    sizes = np.bincount(codes).astype(np.float64)
+    indicator = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                  shape=(len(clusters), len(codes)))
+
+    def reduce(distances, start):
+        return np.asarray((indicator @ distances.T).T)
+
+    sums = np.vstack(list(pairwise_distances_chunked(
+        data[indices], data, reduce_func=reduce, working_memory=working_memory)))
+
+    own = codes[indices]
+    rows = np.arange(len(indices))
+    own_size = sizes[own]
+    a = sums[rows, own] / np.maximum(own_size - 1, 1)
+    means = sums / sizes
+    means[rows, own] = np.inf
+    b = means.min(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(own_size > 1, (b - a) / np.maximum(a, b), 0.0)
+    return np.nan_to_num(scores)
+
+def silhouette_estimate(data, labels, sample_size=2000, strategy='proportional', random_state=42,
+                        working_memory=256):
+    indices = stratified_sample(labels, sample_size, strategy, random_state)
+    scores = silhouette_for(data, labels, indices, working_memory)
+
+    # Cluster means weighted by true cluster size, so 'equal' sampling is not biased
+    clusters, sizes = np.unique(labels, return_counts=True)
+    sampled = labels[indices]
+    per_cluster = {int(c): float(scores[sampled == c].mean()) for c in clusters}
+    overall = float(np.dot([per_cluster[int(c)] for c in clusters], sizes) / sizes.sum())
+    standard_error = float(scores.std(ddof=1) / np.sqrt(len(scores))) if len(scores) > 1 else None
+    return {'silhouette': overall, 'silhouette_se': standard_error, 'silhouette_sample': len(indices),
+            'silhouette_per_cluster': per_cluster}
+
+
+def evaluate_labels(data, labels, sample_size=2000, strategy='proportional', random_state=42,
+                    working_memory=256):
+    # DBSCAN noise is left out: it is not a cluster and would distort every index
+    from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
+
+    labels = np.asarray(labels)
+    clustered = labels != NOISE_LABEL
+    data, labels = data[clustered], labels[clustered]
+    result = {'rows': int(len(labels)), 'noise_ratio': float(1 - clustered.mean()),
+              'n_clusters': int(len(np.unique(labels)))}
+    if result['n_clusters'] < 2:
+        return result
+
+    result.update(silhouette_estimate(data, labels, sample_size, strategy, random_state, working_memory))
+    result['davies_bouldin'] = float(davies_bouldin_score(data, labels))
+    result['calinski_harabasz'] = float(calinski_harabasz_score(data, labels))
+    return result
+
+
+def compare_labelings(labelings):
+    # labelings: {name: (rows, labels)}; every pair is compared on the rows both labelled
+    from sklearn.metrics import adjusted_rand_score
+
+    names = list(labelings)
+    ari = pd.DataFrame(np.eye(len(names)), index=names, columns=names)
+    shared = pd.DataFrame(0, index=names, columns=names)
+    for first, second in itertools.combinations(names, 2):
+        rows_a, labels_a = labelings[first]
+        rows_b, labels_b = labelings[second]
+        common, in_a, in_b = np.intersect1d(rows_a, rows_b, return_indices=True)
+        shared.loc[first, second] = shared.loc[second, first] = len(common)
+        if len(common):
+            ari.loc[first, second] = ari.loc[second, first] = adjusted_rand_score(labels_a[in_a], labels_b[in_b])
+        else:
+            ari.loc[first, second] = ari.loc[second, first] = np.nan
+    for name in names:
+        shared.loc[name, name] = len(labelings[name][0])
+    return ari, shared
+
+
+def evaluate_runs(source_path, label_files, sample_size=2000, strategy='proportional', working_memory=256):
+    # label_files: {name: labels.csv written by main.py}. Every labelling is scored in
+    # the same space: the cached, MinMax-scaled feature matrix of the classes
+    matrix, builder = load_feature_matrix(source_path)
+    labelings, metrics = {}, {}
+    for name, path in label_files.items():
+        frame = pd.read_csv(path)
+        rows, labels = frame['row'].to_numpy(), frame['cluster'].to_numpy()
+        labelings[name] = (rows, labels)
+        data = to_dense(builder.scale(matrix[rows]))
+        metrics[name] = evaluate_labels(data, labels, sample_size, strategy, working_memory=working_memory)
+        print(f"{name}: {metrics[name].get('silhouette')}")
+
+    ari, shared = compare_labelings(labelings)
+    return {
+        'metrics': metrics,
+        'adjusted_rand': json.loads(ari.to_json(orient='index')),
+        'shared_rows': json.loads(shared.to_json(orient='index')),
+    }
+
+def metrics_frame(report):
+    columns = ['rows', 'n_clusters', 'noise_ratio', 'silhouette', 'silhouette_se', 'davies_bouldin',
+               'calinski_harabasz']
+    return pd.DataFrame.from_dict(report['metrics'], orient='index').reindex(columns=columns)
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Cluster quality and agreement of saved labelings")
+    parser.add_argument("labels", nargs="+", help="labels.csv files written by main.py (row, cluster)")
+    parser.add_argument("--data", default=os.path.join(project_dir, "final_clean_data.json"))
+    parser.add_argument("--sample-size", type=int, default=2000, help="points whose silhouette is computed")
+    parser.add_argument("--strategy", choices=["proportional", "equal"], default="proportional")
+    parser.add_argument("--working-memory", type=int, default=256, help="MB per distance block")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    # out/kmeans/labels.csv -> "kmeans"
+    label_files = {os.path.basename(os.path.dirname(os.path.abspath(path))): path for path in args.labels}
+    report = evaluate_runs(args.data, label_files, args.sample_size, args.strategy, args.working_memory)
+    print(metrics_frame(report))
+    print("Adjusted Rand Index:")
+    print(pd.DataFrame(report['adjusted_rand']))
+    if args.output:
+        with open(args.output, mode='w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=1)
@@ -0,0 +1,238 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .data_cache import CATEGORICAL_COLUMNS, default_cache_dir, ensure_cache, load_frame
+
+FEATURES_VERSION = 3
+
+
+class FeatureMatrixBuilder:
+    def __init__(self, categorical_columns=CATEGORICAL_COLUMNS, sparse_output='auto'):
+        self.categorical_columns = list(categorical_columns)
+        # True: CSR matrices with only the set one-hot entries stored; 'auto' picks CSR
+        # when it is smaller than the dense float32 matrix (many categories per column)
+        self.sparse_output = sparse_output
+        self.sparse_ = False
+        self.numeric_columns_ = None
+        self.categories_ = None
+        self.feature_names_ = None
+        self.scaler_ = None
+
+    def _fit_columns(self, df):
+        self.numeric_columns_ = [c for c in df.columns if c not in self.categorical_columns]
+        self.categories_ = {}
+        for col in self.categorical_columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self.categories_[col] = list(values.cat.categories)
+            else:
+                self.categories_[col] = sorted(values.dropna().unique())
+
+        self.feature_names_ = list(self.numeric_columns_)
+        for col in self.categorical_columns:
+            self.feature_names_ += [f"{col}_{category}" for category in self.categories_[col]]
+
+        if self.sparse_output == 'auto':
+            # A CSR row stores (value, column index) for every numeric column and at most
+            # one entry per categorical column, against one float32 per feature when dense
+            stored = len(self.numeric_columns_) + len(self.categorical_columns)
+            self.sparse_ = 2 * stored + 1 < len(self.feature_names_)
+        else:
+            self.sparse_ = bool(self.sparse_output)
+
+    def fit(self, df):
+        self.fit_transform(df)
+        return self
+
+    def _one_hot(self, df):
+        # (row, column) of every set one-hot entry, categorical columns in order
+        rows, cols = [], []
+        offset = len(self.numeric_columns_)
+        for col in self.categorical_columns:
+            categories = self.categories_[col]
+            codes = pd.Categorical(df[col], categories=categories).codes
+            present = np.flatnonzero(codes >= 0)
+            rows.append(present)
+            cols.append(codes[present].astype(np.int64) + offset)
+            offset += len(categories)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def transform(self, df):
+        n_rows = len(df)
+        n_numeric = len(self.numeric_columns_)
+        # Numeric block: float32 downcast with missing values filled with 0
+        numeric = df[self.numeric_columns_].to_numpy(dtype=np.float32, na_value=0)
+        rows, cols = self._one_hot(df)
+
+        if self.sparse_:
+            # Numeric values are stored explicitly (zeros included) so scaling can shift them
+            data = np.concatenate([numeric.ravel(), np.ones(len(rows), dtype=np.float32)])
+            rows = np.concatenate([np.repeat(np.arange(n_rows), n_numeric), rows])
+            cols = np.concatenate([np.tile(np.arange(n_numeric), n_rows), cols])
+            return sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, len(self.feature_names_)))
+
+        # One-hot block: every (row, column) pair is set in one assignment
+        matrix = np.zeros((n_rows, len(self.feature_names_)), dtype=np.float32)
+        matrix[:, :n_numeric] = numeric
+        matrix[rows, cols] = 1.0
+        return matrix
+
+    def fit_transform(self, df):
+        self._fit_columns(df)
+        matrix = self.transform(df)
+
+        # The scaler is fitted on the encoded matrix so new rows reuse the same ranges
+        self.scaler_ = _min_max_scaler()
+        self.scaler_.fit(column_bounds(matrix))
+        return matrix
+
+    def partial_fit(self, df):
+        # Streaming fit: categories come from the first chunk's categorical dtype
+        if self.feature_names_ is None:
+            self._fit_columns(df)
+            self.scaler_ = _min_max_scaler()
+        matrix = self.transform(df)
+        self.scaler_.partial_fit(column_bounds(matrix))
+        return matrix
+
+    def scale(self, matrix):
+        if not sparse.issparse(matrix):
+            return self.scaler_.transform(matrix).astype(np.float32, copy=False)
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32, copy=True)
+        scale = self.scaler_.scale_.astype(np.float32)
+        shift = self.scaler_.min_.astype(np.float32)
+        # An unstored zero scales to min_, so columns with min_ != 0 (numeric columns with
+        # a nonzero minimum) are stored in full; the other columns keep their zeros implicit
+        shifted = np.flatnonzero(shift)
+        if len(shifted):
+            n_rows = matrix.shape[0]
+            kept = matrix.tocoo()
+            unshifted = shift[kept.col] == 0
+            matrix = sparse.csr_matrix((
+                np.concatenate([kept.data[unshifted], matrix[:, shifted].toarray().ravel()]),
+                (np.concatenate([kept.row[unshifted], np.repeat(np.arange(n_rows), len(shifted))]),
+                 np.concatenate([kept.col[unshifted], np.tile(shifted, n_rows)])),
+            ), shape=matrix.shape, dtype=np.float32)
+        matrix.data *= scale[matrix.indices]
+        matrix.data += shift[matrix.indices]
+        return matrix
+
+    def to_frame(self, matrix):
+        if sparse.issparse(matrix):
+            # Built column by column: from_spmatrix may use NaN rather than 0 as fill value.
+            # Numeric columns stay dense so their zeros are real values, not fill
+            columns = matrix.tocsc()
+            n_numeric = len(self.numeric_columns_)
+            return pd.DataFrame({
+                name: columns[:, i].toarray().ravel() if i < n_numeric else
+                pd.arrays.SparseArray(columns[:, i].toarray().ravel(), fill_value=0)
+                for i, name in enumerate(self.feature_names_)
+            })
+        return pd.DataFrame(matrix, columns=self.feature_names_, copy=False)
+
+    def config(self):
+        return {'version': FEATURES_VERSION, 'categorical_columns': self.categorical_columns,
+                'sparse_output': self.sparse_output}
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+def _min_max_scaler():
+    # sklearn is only imported when a builder is fitted, not when features is imported
+    from sklearn.preprocessing import MinMaxScaler
+    return MinMaxScaler()
+
+def column_bounds(matrix):
+    # Column minima and maxima as two rows: fitting MinMaxScaler on them gives the same
+    # ranges as fitting on the matrix, and works for CSR input, which the scaler rejects
+    if sparse.issparse(matrix):
+        return np.vstack([matrix.min(axis=0).toarray(), matrix.max(axis=0).toarray()])
+    if not len(matrix):
+        return matrix
+    return np.vstack([matrix.min(axis=0), matrix.max(axis=0)])
+
+def to_dense(matrix):
+    return matrix.toarray() if sparse.issparse(matrix) else matrix
+
+def matrix_nbytes(matrix):
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+def memory_report(df, matrix):
+    # Memory of the loaded frame, of the same frame with object-dtype strings instead of
+    # categoricals, and of the encoded matrix in its dense and CSR forms
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    frame = df.memory_usage(deep=True).sum()
+    as_objects = frame - df[categorical].memory_usage(deep=True, index=False).sum() + \
+        df[categorical].astype(object).memory_usage(deep=True, index=False).sum()
+    n_rows, n_features = matrix.shape
+    nnz = matrix.nnz if sparse.issparse(matrix) else int(np.count_nonzero(matrix))
+    report = {
+        'frame_object_mb': as_objects / 1e6,
+        'frame_mb': frame / 1e6,
+        'matrix_mb': matrix_nbytes(matrix) / 1e6,
+        'dense_mb': n_rows * n_features * 4 / 1e6,
+        'sparse_mb': (nnz * 8 + (n_rows + 1) * 4) / 1e6,
+    }
+    print(f"Memory: frame {report['frame_object_mb']:.1f} MB with object strings -> "
+          f"{report['frame_mb']:.1f} MB categorical; encoded {report['matrix_mb']:.1f} MB "
+          f"(dense {report['dense_mb']:.1f} MB, CSR {report['sparse_mb']:.1f} MB)")
+    return report
+
+def config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+def load_feature_matrix(source_path, categorical_columns=CATEGORICAL_COLUMNS, cache_dir=None,
+                        sparse_output='auto'):
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    manifest = ensure_cache(source_path, cache_dir)
+
+    builder = FeatureMatrixBuilder(categorical_columns, sparse_output)
+    key = config_hash({**builder.config(), 'source_hash': manifest['source_hash']})
+    matrix_paths = [os.path.join(cache_dir, f'features_{key}{ext}') for ext in ('.npy', '.npz')]
+    builder_path = os.path.join(cache_dir, f'features_{key}.pkl')
+
+    if os.path.exists(builder_path):
+        if os.path.exists(matrix_paths[0]):
+            print(f"Feature matrix loaded from cache ({key}).")
+            return np.load(matrix_paths[0], mmap_mode='c'), FeatureMatrixBuilder.load(builder_path)
+        if os.path.exists(matrix_paths[1]):
+            print(f"Sparse feature matrix loaded from cache ({key}).")
+            return sparse.load_npz(matrix_paths[1]).tocsr(), FeatureMatrixBuilder.load(builder_path)
+
+    matrix = builder.fit_transform(load_frame(source_path, cache_dir=cache_dir))
+
+    # Matrices built for an older source or config are never read again
+    for stale_path in glob.glob(os.path.join(cache_dir, 'features_*')):
+        os.remove(stale_path)
+    if sparse.issparse(matrix):
+        sparse.save_npz(matrix_paths[1], matrix, compressed=False)
+    else:
+        np.save(matrix_paths[0], matrix)
+    builder.save(builder_path)
+    return matrix, builder
+
+def encode_frame(df, source_path=None, sparse_output='auto'):
+    # The cached matrix of source_path is only reused while df is still exactly the
+    # cached frame; a filtered or edited df is encoded (and its scaler fitted) on its own
+    if source_path and df.equals(load_frame(source_path)):
+        return load_feature_matrix(source_path, sparse_output=sparse_output)
+    builder = FeatureMatrixBuilder(sparse_output=sparse_output)
+    return builder.fit_transform(df), builder
@@ -0,0 +1,214 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .association_rules import generate_rules
+from .data_cache import load_frame
+from .transactions import TransactionEncoder, TransactionMatrix
+
+
+PRICE_CHANGE_COLUMN = "saleEstimate_valueChange.percentageChange"
+
+
+def transaction_encoder():
+    # Price/area ranges on the notebook's 0..max bins (pd.cut without include_lowest, so
+    # 0 gets no range), tenure and property type. Two deviations from fp_growth.ipynb:
+    # item names carry the source column (saleEstimate_currentPrice_very_low, not
+    # price_range_very_low), and the price change sign is taken on the raw value, with
+    # 0 and missing changes negative. The notebook thresholds the MinMax-scaled change,
+    # where only the column minimum and missing values come out negative
+    return TransactionEncoder(
+        numeric_columns=["saleEstimate_currentPrice", "floorAreaSqM", PRICE_CHANGE_COLUMN],
+        categorical_columns=["tenure", "propertyType"],
+        strategy="zero_to_max",
+        n_bins={"saleEstimate_currentPrice": 4, "floorAreaSqM": 3},
+        edges={PRICE_CHANGE_COLUMN: [-np.inf, 0, np.inf]},
+        labels={PRICE_CHANGE_COLUMN: ["negative", "positive"]},
+        include_lowest=False,
+        fill_values={PRICE_CHANGE_COLUMN: 0},
+    )
+
+def load_transactions(json_file_path):
+    encoder = transaction_encoder()
+    df = load_frame(json_file_path, columns=encoder.numeric_columns + encoder.categorical_columns)
+    return encoder.fit_transform(df)
+
+
+class FPTree:
+    # Nodes live in parallel lists indexed by node id; node 0 is the root
+    def __init__(self):
+        self.item = [-1]
+        self.count = [0]
+        self.parent = [-1]
+        self.node_link = [-1]
+        self.children = {}
+        self.header = {}
+
+    def insert(self, items, count=1):
+        node = 0
+        for item in items:
+            child = self.children.get((node, item))
+            if child is None:
+                child = len(self.item)
+                self.item.append(item)
+                self.count.append(0)
+                self.parent.append(node)
+                # Prepend to the item's node-link chain
+                self.node_link.append(self.header.get(item, -1))
+                self.header[item] = child
+                self.children[(node, item)] = child
+            self.count[child] += count
+            node = child
+
+    def nodes(self, item):
+        node = self.header.get(item, -1)
+        while node != -1:
+            yield node
+            node = self.node_link[node]
+
+    def prefix_path(self, node):
+        path = []
+        node = self.parent[node]
+        while node > 0:
+            path.append(self.item[node])
+            node = self.parent[node]
+        path.reverse()
+        return path
+
+
+class FPGrowth:
+    def __init__(self, min_support=0.05, max_length=None):
+        self.min_support = min_support
+        self.max_length = max_length
+
+    def get_frequent_itemsets(self, transactions, item_names=None):
+        if not isinstance(transactions, TransactionMatrix):
+            transactions = TransactionMatrix.from_lists(transactions)
+        names = transactions.item_names
+        if item_names is not None:
+            names = [item_names[item] for item in names]
+        min_count = self.min_support * len(transactions)
+
+        # Rank items by descending frequency; rank 0 is the most frequent item
+        counts = transactions.item_counts()
+        frequent = [item for item in np.argsort(-counts, kind="stable") if counts[item] >= min_count]
+        rank = np.full(transactions.n_items + 1, -1, dtype=np.int64)
+        rank[frequent] = np.arange(len(frequent))
+
+        # Identical transactions are inserted once with their multiplicity;
+        # the -1 padding maps to rank -1 through the extra slot and is dropped
+        rows, multiplicity = transactions.unique_rows()
+        ranked_rows = np.sort(rank[rows], axis=1)
+        tree = FPTree()
+        for row, count in zip(ranked_rows.tolist(), multiplicity.tolist()):
+            tree.insert([r for r in row if r >= 0], count)
+
+        ranked_itemsets = {}
+        self._mine(tree, (), min_count, ranked_itemsets)
+
+        return {
+            frozenset(names[frequent[r]] for r in itemset): count
+            for itemset, count in ranked_itemsets.items()
+        }
+
+    def _mine(self, tree, prefix, min_count, frequent_itemsets):
+        # Least frequent items first (highest rank), as in the classic bottom-up walk
+        for item in sorted(tree.header, reverse=True):
+            paths = [(tree.prefix_path(node), tree.count[node]) for node in tree.nodes(item)]
+            support = sum(count for _, count in paths)
+            if support < min_count:
+                continue
+
+            itemset = prefix + (item,)
+            frequent_itemsets[itemset] = support
+            if self.max_length is not None and len(itemset) >= self.max_length:
+                continue
+
+            # Conditional FP-tree from the item's prefix paths
+            path_counts = {}
+            for path, count in paths:
+                for path_item in path:
+                    path_counts[path_item] = path_counts.get(path_item, 0) + count
+            conditional = FPTree()
+            for path, count in paths:
+                path = [path_item for path_item in path if path_counts[path_item] >= min_count]
+                if path:
+                    conditional.insert(path, count)
+            if conditional.header:
+                self._mine(conditional, itemset, min_count, frequent_itemsets)
+
+    def generate_rules(self, frequent_itemsets, transactions, min_confidence=0.7):
+        return generate_rules(frequent_itemsets, len(transactions), min_confidence=min_confidence)
+
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+def benchmark(json_file_path, min_supports=(0.01, 0.05, 0.1, 0.2)):
+    try:
+        from mlxtend.frequent_patterns import fpgrowth
+    except ImportError:
+        fpgrowth = None
+        print("mlxtend is not installed; only the native path is benchmarked.")
+
+    results = []
+    for min_support in min_supports:
+        def native():
+            return FPGrowth(min_support).get_frequent_itemsets(load_transactions(json_file_path))
+
+        itemsets, elapsed, peak = _measure(native)
+        results.append({"path": "native", "min_support": min_support, "itemsets": len(itemsets),
+                        "seconds": elapsed, "peak_mb": peak})
+
+        if fpgrowth is None:
+            continue
+
+        def dense():
+            # The notebook path: a dense boolean one-hot frame fed to mlxtend
+            return fpgrowth(load_transactions(json_file_path).to_dense(), min_support=min_support)
+
+        itemsets, elapsed, peak = _measure(dense)
+        results.append({"path": "mlxtend", "min_support": min_support, "itemsets": len(itemsets),
+                        "seconds": elapsed, "peak_mb": peak})
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="FP-Growth frequent itemsets and association rules")
+    parser.add_argument("--data", default=os.path.join(project_dir, "final_clean_data.json"))
+    parser.add_argument("--min-support", type=float, default=0.05)
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare time and peak memory against mlxtend at several min_support levels")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.data)
+    else:
+        transactions = load_transactions(args.data)
+        fp_growth = FPGrowth(args.min_support)
+        frequent_itemsets = fp_growth.get_frequent_itemsets(transactions)
+
+        print("Frequent Itemsets:")
+        for itemset, support in sorted(frequent_itemsets.items(), key=lambda x: -x[1]):
+            print(f"{set(itemset)}: {support}")
+
+        rules = fp_growth.generate_rules(frequent_itemsets, transactions, args.min_confidence)
+        print("Association Rules:")
+        print(rules)
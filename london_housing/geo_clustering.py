@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from .data_cache import load_frame
+from .instrumentation import instrumented
+from .plotting import plot_density
+
+# Mean Earth radius; haversine distances on the BallTree are in radians
+EARTH_RADIUS_KM = 6371.0088
+COORDINATE_COLUMNS = ['latitude', 'longitude']
+PRICE_FEATURES = ['rentEstimate_currentPrice', 'saleEstimate_currentPrice', 'floorAreaSqM']
+
+
+class GeoDBSCAN:
+    # DBSCAN on great-circle distance. Neighbor lists are only ever held for one batch,
+    # so memory is bounded by batch_size * neighbors instead of the whole radius graph
+    def __init__(self, eps_km=0.3, min_samples=20, batch_size=20000, leaf_size=40):
+        self.eps_km = eps_km
+        self.min_samples = min_samples
+        self.batch_size = batch_size
+        self.leaf_size = leaf_size
+        self.tree = None
+        self.core_sample_indices_ = None
+        self.labels_ = None
+
+    def _batches(self, indices):
+        for start in range(0, len(indices), self.batch_size):
+            yield indices[start:start + self.batch_size]
+
+    @instrumented()
+    def fit(self, coordinates):
+        # coordinates: (n, 2) latitude/longitude in degrees
+        from sklearn.neighbors import BallTree
+
+        points = np.radians(np.asarray(coordinates, dtype=np.float64))
+        n_points = len(points)
+        radius = self.eps_km / EARTH_RADIUS_KM
+        self.tree = BallTree(points, metric='haversine', leaf_size=self.leaf_size)
+        everything = np.arange(n_points)
+
+        # Pass 1: neighbor counts (the point itself included, as in sklearn's DBSCAN)
+        counts = np.concatenate([
+            self.tree.query_radius(points[batch], radius, count_only=True)
+            for batch in self._batches(everything)
+        ])
+        core = counts >= self.min_samples
+        core_indices = np.flatnonzero(core)
+
+        # Pass 2: connect core points that lie within eps of each other. Each batch's
+        # edges are collapsed onto the components found so far and merged with them
+        component = np.arange(n_points)
+        for batch in self._batches(core_indices):
+            neighbors = self.tree.query_radius(points[batch], radius)
+            sources = np.repeat(batch, counts[batch])
+            targets = np.concatenate(neighbors)
+            linked = core[targets]
+            sources, targets = component[sources[linked]], component[targets[linked]]
+            crossing = sources != targets
+            if crossing.any():
+                graph = sparse.coo_matrix(
+                    (np.ones(crossing.sum(), dtype=np.int8), (sources[crossing], targets[crossing])),
+                    shape=(n_points, n_points),
+                )
+                component = connected_components(graph, directed=False)[1][component]
+
+        labels = np.full(n_points, -1, dtype=np.int64)
+        if len(core_indices):
+            labels[core_indices] = np.unique(component[core_indices], return_inverse=True)[1]
+
+        # Pass 3: border points join the cluster of their nearest core neighbor. Each
+        # batch is flattened to (point, neighbor, distance) triples, kept to core
+        # neighbors and sorted by point then distance; a point's first triple wins
+        for batch in self._batches(np.flatnonzero(~core)):
+            neighbors, distances = self.tree.query_radius(points[batch], radius, return_distance=True)
+            sources = np.repeat(batch, counts[batch])
+            targets = np.concatenate(neighbors)
+            distances = np.concatenate(distances)
+            linked = core[targets]
+            sources, targets, distances = sources[linked], targets[linked], distances[linked]
+            if not len(sources):
+                continue
+            order = np.lexsort((distances, sources))
+            first = order[np.unique(sources[order], return_index=True)[1]]
+            labels[sources[first]] = labels[targets[first]]
+
+        self.core_sample_indices_ = core_indices
+        self.labels_ = labels
+        print(f"Geo DBSCAN: eps={self.eps_km} km, {len(core_indices)} core points, "
+              f"{labels.max() + 1} clusters, noise ratio {np.mean(labels == -1):.3f}")
+        return labels
+
+
+@instrumented()
+def two_stage_labels(geo_labels, features, n_clusters=3, random_state=42):
+    # Second stage: split every location cluster by standardized (log) price features.
+    # The scaler is shared so segments mean the same thing in every hotspot
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    features = StandardScaler().fit_transform(np.log1p(np.maximum(features, 0)))
+    labels = np.full(len(geo_labels), -1, dtype=np.int64)
+    order = np.argsort(geo_labels, kind='stable')
+    bounds = np.searchsorted(geo_labels[order], np.arange(geo_labels.max() + 2))
+    next_label = 0
+    for geo_label in range(geo_labels.max() + 1):
+        members = order[bounds[geo_label]:bounds[geo_label + 1]]
+        k = min(n_clusters, len(members))
+        if k < 2:
+            labels[members] = next_label
+            next_label += 1
+            continue
+        model = KMeans(n_clusters=k, n_init=3, random_state=random_state)
+        labels[members] = model.fit_predict(features[members]) + next_label
+        next_label += k
+    return labels
+
+
+class GeoClustering:
+    def __init__(self, eps_km=0.3, min_samples=20, price_clusters=None, batch_size=20000):
+        self.model = GeoDBSCAN(eps_km=eps_km, min_samples=min_samples, batch_size=batch_size)
+        # Number of price segments per location cluster; None keeps location only
+        self.price_clusters = price_clusters
+        self.df = None
+        self.geo_labels = None
+        self.hotspots = None
+        self.cluster_summary = None
+        self.sample_index = None
+
+    @instrumented()
+    def load_data(self, file_name):
+        df = load_frame(file_name, columns=COORDINATE_COLUMNS + PRICE_FEATURES)
+        df = df.dropna(subset=COORDINATE_COLUMNS)
+        print(f"Loaded Data Shape: {df.shape}")
+        return df
+
+    def hotspot_table(self, labels):
+        # Size, center and typical price of every location cluster, largest first
+        clustered = self.df[labels >= 0].assign(Cluster=labels[labels >= 0])
+        hotspots = clustered.groupby('Cluster').agg(
+            listings=('latitude', 'size'),
+            latitude=('latitude', 'mean'),
+            longitude=('longitude', 'mean'),
+            median_price=('saleEstimate_currentPrice', 'median'),
+            median_rent=('rentEstimate_currentPrice', 'median'),
+        )
+        return hotspots.sort_values('listings', ascending=False)
+
+    @instrumented()
+    def cluster_and_visualize(self, file_name, sample_size=None):
+        self.df = self.load_data(file_name)
+        if sample_size is not None and sample_size < len(self.df):
+            self.df = self.df.sample(n=sample_size, random_state=42)
+
+        # Stage 1: density clustering on location
+        self.geo_labels = self.model.fit(self.df[COORDINATE_COLUMNS].to_numpy())
+        self.hotspots = self.hotspot_table(self.geo_labels)
+        print("Location hotspots:")
+        print(self.hotspots.head(20))
+
+        # Stage 2 (optional): price segments inside every hotspot
+        labels = self.geo_labels
+        if self.price_clusters:
+            clustered = labels >= 0
+            features = self.df[PRICE_FEATURES].fillna(0).to_numpy()
+            labels = np.full(len(labels), -1, dtype=np.int64)
+            labels[clustered] = two_stage_labels(self.geo_labels[clustered], features[clustered],
+                                                 n_clusters=self.price_clusters)
+
+        plot_density(self.df['longitude'].to_numpy(), self.df['latitude'].to_numpy(), labels,
+                     name='geo_clusters', title="Geo Clustering (haversine DBSCAN)",
+                     xlabel="Longitude", ylabel="Latitude", cmap='tab20', figsize=(8, 8))
+
+        self.sample_index = self.df.index
+        self.cluster_summary = self.df.assign(Cluster=labels).groupby('Cluster').mean()
+        print("Cluster Summary:")
+        print(self.cluster_summary)
+        return labels
+
+
+# Usage example
+if __name__ == "__main__":
+    geo = GeoClustering(eps_km=0.3, min_samples=20, price_clusters=3)
+    labels = geo.cluster_and_visualize('final_clean_data.json')
+    print(pd.Series(labels).value_counts().head(10))
@@ -0,0 +1,179 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .features import to_dense
+from .ingest import SCHEMA, assemble_frame, parse_rows, read_rows
+from .kmeans import OptimizedKMeansClustering
+
+# A listing is identified by its address and sale date; the raw file has one row per sale
+KEY_COLUMNS = ('fullAddress', 'history_date')
+STATE_NAME = 'state.npz'
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def row_key(entry, key_columns=KEY_COLUMNS):
+    return _hash64('\x1f'.join(entry.get(column) or '' for column in key_columns))
+
+def content_hash(entry):
+    # Hash of the raw values, so any edited field marks the row as changed
+    return _hash64('\x1f'.join(f'{column}={value}' for column, value in sorted(entry.items())))
+
+
+class IncrementalState:
+    # Manifest of processed rows sorted by key, with each row's cluster and encoded
+    # features, plus per-cluster sums and counts for the running summary
+    def __init__(self, n_clusters, feature_names):
+        self.feature_names = list(feature_names)
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.labels = np.empty(0, dtype=np.int32)
+        self.features = np.empty((0, len(self.feature_names)), dtype=np.float32)
+        self.sums = np.zeros((n_clusters, len(self.feature_names)))
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, keys):
+        # Position of every key in the manifest, -1 when it has not been seen
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[positions] == keys, positions, -1)
+
+    def _accumulate(self, labels, features, sign):
+        assigned = labels >= 0
+        np.add.at(self.sums, labels[assigned], sign * features[assigned].astype(np.float64))
+        self.counts += sign * np.bincount(labels[assigned], minlength=len(self.counts))
+
+    def update(self, keys, hashes, labels, features):
+        # Changed rows first give back their previous contribution, then every row adds its new one
+        positions = self.lookup(keys)
+        known = positions >= 0
+        self._accumulate(self.labels[positions[known]], self.features[positions[known]], -1)
+        self._accumulate(labels, features, 1)
+
+        self.hashes[positions[known]] = hashes[known]
+        self.labels[positions[known]] = labels[known]
+        self.features[positions[known]] = features[known]
+
+        new = ~known
+        if new.any():
+            keys = np.concatenate([self.keys, keys[new]])
+            order = np.argsort(keys, kind='stable')
+            self.keys = keys[order]
+            self.hashes = np.concatenate([self.hashes, hashes[new]])[order]
+            self.labels = np.concatenate([self.labels, labels[new]])[order]
+            self.features = np.concatenate([self.features, features[new]])[order]
+
+    def summary(self):
+        summary = pd.DataFrame(self.sums / np.maximum(self.counts, 1)[:, None], columns=self.feature_names)
+        summary.insert(0, 'count', self.counts)
+        summary.index.name = 'Cluster'
+        return summary
+
+    def save(self, path):
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, keys=self.keys, hashes=self.hashes, labels=self.labels, features=self.features,
+                 sums=self.sums, counts=self.counts, feature_names=np.array(self.feature_names))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            state = cls(len(data['counts']), data['feature_names'].tolist())
+            for name in ('keys', 'hashes', 'labels', 'features', 'sums', 'counts'):
+                setattr(state, name, data[name])
+        return state
+
+
+class IncrementalClusterer:
+    def __init__(self, model_path, state_dir, key_columns=KEY_COLUMNS, update_model=False):
+        self.model_path = model_path
+        self.state_path = os.path.join(state_dir, STATE_NAME)
+        self.key_columns = tuple(key_columns)
+        # partial_fit the centroids on every delta; rows assigned earlier keep their labels
+        self.update_model = update_model
+        self.kmeans = OptimizedKMeansClustering.load(model_path)
+        os.makedirs(state_dir, exist_ok=True)
+        if os.path.exists(self.state_path):
+            self.state = IncrementalState.load(self.state_path)
+        else:
+            self.state = IncrementalState(self.kmeans.n_clusters, self.kmeans.builder.feature_names_)
+
+    def select_rows(self, header, rows):
+        # Keys, content hashes and positions of the new or changed rows (latest row wins per key)
+        pending = {}
+        for i, row in enumerate(rows):
+            entry = dict(zip(header, row))
+            pending[row_key(entry, self.key_columns)] = (content_hash(entry), i)
+
+        keys = np.fromiter(pending, dtype=np.uint64, count=len(pending))
+        hashes = np.fromiter((value[0] for value in pending.values()), dtype=np.uint64, count=len(pending))
+        indices = np.fromiter((value[1] for value in pending.values()), dtype=np.int64, count=len(pending))
+        positions = self.state.lookup(keys)
+        unchanged = positions >= 0
+        unchanged[unchanged] = self.state.hashes[positions[unchanged]] == hashes[unchanged]
+        self.skipped = int(unchanged.sum())
+        return keys[~unchanged], hashes[~unchanged], indices[~unchanged]
+
+    def process_delta(self, csv_file_path):
+        # Selected rows are cleaned by the same schema parse as a full ingest_csv build
+        header, rows, lines, _ = read_rows(csv_file_path)
+        keys, hashes, indices = self.select_rows(header, rows)
+        keep, numeric, categorical, _ = parse_rows([rows[i] for i in indices], [lines[i] for i in indices],
+                                                   header, SCHEMA)
+        rejected_keys, rejected_hashes = keys[~keep], hashes[~keep]
+        keys, hashes = keys[keep], hashes[keep]
+
+        n_features = len(self.state.feature_names)
+        if len(keys):
+            df = assemble_frame([(numeric, categorical)], SCHEMA)
+            matrix, reduced = self.kmeans.transform(df)
+            matrix = to_dense(matrix)
+            if self.update_model and len(reduced) >= self.kmeans.n_clusters:
+                self.kmeans.model.partial_fit(reduced)
+            labels = self.kmeans.model.predict(reduced).astype(np.int32)
+        else:
+            matrix = np.empty((0, n_features), dtype=np.float32)
+            labels = np.empty(0, dtype=np.int32)
+        self.state.update(keys, hashes, labels, matrix)
+
+        # Rows rejected by the schema are remembered with cluster -1 so an unchanged
+        # copy in a later delta is skipped instead of cleaned again
+        if len(rejected_keys):
+            self.state.update(rejected_keys, rejected_hashes,
+                              np.full(len(rejected_keys), -1, dtype=np.int32),
+                              np.zeros((len(rejected_keys), n_features), dtype=np.float32))
+
+        self.state.save(self.state_path)
+        if self.update_model:
+            self.kmeans.save(self.model_path)
+
+        result = {'assigned': len(labels), 'rejected': len(rejected_keys), 'skipped': self.skipped,
+                  'manifest_rows': len(self.state)}
+        print(f"Delta processed: {result}")
+        return labels, result
+
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean and cluster only the new or changed rows of a raw CSV")
+    parser.add_argument("delta", help="raw CSV with the Kaggle columns (a daily delta or the full file)")
+    parser.add_argument("--model", default="kmeans_model.pkl", help="pipeline saved by OptimizedKMeansClustering.save")
+    parser.add_argument("--state-dir", default="incremental_state")
+    parser.add_argument("--update-model", action="store_true", help="partial_fit the centroids on the delta")
+    args = parser.parse_args()
+
+    clusterer = IncrementalClusterer(args.model, args.state_dir, update_model=args.update_model)
+    clusterer.process_delta(args.delta)
+
+    print("Cluster Summary:")
+    print(clusterer.state.summary())
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .json_convert import FEATURES_TO_DROP, KEEP, NULL_VALUES, REJECT, SCHEMA
+
+# The cleaning rules live in json_convert.SCHEMA; they are applied here column-wise
+DROPPED_COLUMNS = FEATURES_TO_DROP
+
+
+def read_header(path):
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        line = f.readline()
+        return next(csv.reader([line])), len(line.encode('utf-8'))
+
+def byte_ranges(path, start, chunk_size):
+    # Offsets chunk_size bytes apart, each moved to the start of the next line. Assumes
+    # no newline inside a quoted field; a split row would be rejected by its field count
+    size = os.path.getsize(path)
+    offsets = [start]
+    with open(path, 'rb') as f:
+        while offsets[-1] + chunk_size < size:
+            f.seek(offsets[-1] + chunk_size)
+            f.readline()
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _parse_numeric(values):
+    # Fast path converts the whole column at once; only a failing column is retried
+    # value by value to find the entries that are not numbers
+    try:
+        return np.array(values, dtype=np.float64), None
+    except ValueError:
+        parsed = np.empty(len(values), dtype=np.float64)
+        invalid = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except ValueError:
+                parsed[i] = np.nan
+                invalid[i] = True
+        return parsed, invalid
+
+def _read_rows(data, header):
+    # Rows of a CSV byte block with their line numbers in the block; a row with the wrong
+    # number of fields is rejected
+    rows, lines, rejected = [], [], []
+    reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+    for row in reader:
+        if len(row) == len(header):
+            rows.append(row)
+            lines.append(reader.line_num)
+        elif row:
+            rejected.append((reader.line_num, None, f'expected {len(header)} fields, got {len(row)}', None))
+    return rows, lines, rejected
+
+def read_rows(path):
+    # Every row of a CSV file as a list of strings, with its line number in the file
+    header, header_size = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(header_size)
+        rows, lines, rejected = _read_rows(f.read(), header)
+    lines = [line + 1 for line in lines]
+    rejected = [(line + 1, column, reason, value) for line, column, reason, value in rejected]
+    return header, rows, lines, rejected
+
+def parse_rows(rows, lines, header, schema=SCHEMA):
+    # Typed, cleaned columns of raw rows (lists of strings in header order). Returns the
+    # mask of kept rows, the kept numeric values and (categories, codes) per categorical
+    # column, and one (line, column, reason, value) per reason a row was dropped.
+    # Transposed once, so every schema column is a single tuple of strings
+    fields = list(zip(*rows)) or [()] * len(header)
+    columns = [fields[header.index(name)] for name in schema]
+
+    lines = np.array(lines, dtype=np.int64)
+    reject = np.zeros(len(lines), dtype=bool)
+    reasons = []
+    numeric, categorical = {}, {}
+    for (name, (kind, on_null)), values in zip(schema.items(), columns):
+        values = np.array(values, dtype=object)
+        null = np.isin(values, NULL_VALUES)
+        if on_null == REJECT:
+            reject |= null
+            reasons.append((null, name, 'missing', values))
+        if kind == 'numeric':
+            parsed, invalid = _parse_numeric(np.where(null, 'nan', values).tolist())
+            if invalid is not None:
+                reject |= invalid
+                reasons.append((invalid, name, 'not a number', values))
+            if on_null not in (KEEP, REJECT):
+                parsed[null] = on_null
+            numeric[name] = parsed
+        else:
+            if on_null not in (KEEP, REJECT):
+                values[null] = on_null
+                null[:] = False
+            categories, codes = np.unique(values[~null].astype(str), return_inverse=True)
+            full_codes = np.full(len(values), -1, dtype=np.int32)
+            full_codes[~null] = codes
+            categorical[name] = (categories.tolist(), full_codes)
+
+    rejected = []
+    for mask, name, reason, values in reasons:
+        for i in np.flatnonzero(mask):
+            rejected.append((int(lines[i]), name, reason, values[i]))
+    keep = ~reject
+    numeric = {name: values[keep] for name, values in numeric.items()}
+    categorical = {name: (categories, codes[keep]) for name, (categories, codes) in categorical.items()}
+    return keep, numeric, categorical, rejected
+
+def _parse_range(path, start, stop, header, schema):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    n_lines = data.count(b'\n') + (1 if data and not data.endswith(b'\n') else 0)
+
+    rows, lines, rejected = _read_rows(data, header)
+    keep, numeric, categorical, row_rejected = parse_rows(rows, lines, header, schema)
+    return n_lines, int(keep.sum()), numeric, categorical, rejected + row_rejected
+
+def assemble_frame(parts, schema=SCHEMA):
+    # One frame from the (numeric, categorical) columns of parse_rows calls, in order
+    frame = {}
+    for name, (kind, _) in schema.items():
+        if kind == 'numeric':
+            frame[name] = np.concatenate([numeric[name] for numeric, _ in parts])
+            continue
+        # Every part has its own categories; codes are remapped onto their sorted union
+        categories = sorted(set().union(*(categorical[name][0] for _, categorical in parts)))
+        codes = []
+        for _, categorical in parts:
+            part_categories, part_codes = categorical[name]
+            # The trailing -1 keeps missing values (code -1) missing after the lookup
+            mapping = np.append(np.searchsorted(categories, part_categories), -1).astype(np.int32)
+            codes.append(mapping[part_codes])
+        frame[name] = pd.Categorical.from_codes(np.concatenate(codes), categories=categories)
+    return pd.DataFrame(frame, copy=False)
+
+
+def ingest_csv(path, schema=SCHEMA, n_jobs=None, chunk_size=4 << 20):
+    # Typed, cleaned columns of a raw listings CSV, parsed in parallel byte ranges.
+    # Returns (frame, rejected) where rejected has one row per reason a row was dropped
+    header, header_size = read_header(path)
+    missing = [name for name in schema if name not in header]
+    if missing:
+        raise ValueError(f"{path} is missing schema columns: {', '.join(missing)}")
+
+    ranges = byte_ranges(path, header_size, chunk_size)
+    if n_jobs == 1 or len(ranges) == 1:
+        parts = [_parse_range(path, start, stop, header, schema) for start, stop in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            futures = [pool.submit(_parse_range, path, start, stop, header, schema) for start, stop in ranges]
+            parts = [future.result() for future in futures]
+
+    # Line numbers are local to each range; shift them past the header and earlier ranges
+    rejected, first_line = [], 2
+    for n_lines, _, _, _, part_rejected in parts:
+        rejected += [(first_line + line - 1, column, reason, value) for line, column, reason, value in part_rejected]
+        first_line += n_lines
+
+    frame = assemble_frame([(part[2], part[3]) for part in parts], schema)
+    rejected = rejected_frame(rejected)
+    print(f"Ingested {len(frame)} rows from {os.path.basename(path)} in {len(ranges)} ranges; "
+          f"{rejected['line'].nunique()} rows rejected")
+    return frame, rejected
+
+def rejected_frame(rejected):
+    # (line, column, reason, value) tuples as a frame in line order
+    rejected = pd.DataFrame(rejected, columns=['line', 'column', 'reason', 'value'])
+    return rejected.sort_values('line', kind='stable').reset_index(drop=True)
+
+def rejection_summary(rejected):
+    # Rows per (column, reason); a row missing two required values counts under both
+    return rejected.fillna({'column': ''}).groupby(['column', 'reason']).size().rename('rows').reset_index()
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Parse the raw listings CSV into the typed column cache")
+    parser.add_argument("csv", nargs="?", default=os.path.join(project_dir, "kaggle_london_house_price_data.csv"))
+    parser.add_argument("--jobs", type=int, help="parser processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=4 << 20, help="bytes per parsed range")
+    parser.add_argument("--rejected", help="write every rejected row with its reason to this CSV")
+    args = parser.parse_args()
+
+    frame, rejected = ingest_csv(args.csv, n_jobs=args.jobs, chunk_size=args.chunk_size)
+    print(rejection_summary(rejected).to_string(index=False))
+    if args.rejected:
+        rejected.to_csv(args.rejected, index=False)
+
+    # Stored as the column cache every loader reads, so later runs skip parsing entirely
+    from .data_cache import build_cache
+    frame.attrs['rejected'] = rejected
+    build_cache(args.csv, df=frame)
@@ -0,0 +1,168 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Environment variable that switches tracing on for any script (value: JSON lines file path)
+TRACE_ENV = "HOUSING_TRACE"
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then recorded as None
+    resource = None
+
+# ru_maxrss is reported in KiB on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# Receives one dict per finished stage; None means disabled
+_sink = None
+_local = threading.local()
+
+
+class JsonLinesSink:
+    # Appends one JSON object per line; small appends from several processes stay whole
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, record):
+        with open(self.path, mode='a', encoding='utf-8') as trace_file:
+            trace_file.write(json.dumps(record) + "\n")
+
+
+class ListSink:
+    # Keeps records in memory, handy in notebooks and benchmarks
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+
+def set_sink(sink):
+    # sink is any callable taking a record dict, or None to disable
+    global _sink
+    _sink = sink
+    return sink
+
+def enable(path):
+    return set_sink(JsonLinesSink(path))
+
+def disable():
+    set_sink(None)
+
+def enabled():
+    return _sink is not None
+
+
+def max_rss():
+    # Peak resident set size of this process in bytes, or None where it cannot be read
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+def rss_delta_mb(before, after):
+    if before is None or after is None:
+        return None
+    return round((after - before) / 2**20, 3)
+
+def _shape(value):
+    shape = getattr(value, "shape", None)
+    if shape is not None:
+        return tuple(shape)
+    if hasattr(value, "n_items"):
+        return (len(value), value.n_items)
+    if isinstance(value, (list, dict)):
+        return (len(value),)
+    return None
+
+
+class _Stage:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.shape = None
+
+    def set_shape(self, shape):
+        self.shape = shape
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start_time = time.time()
+        self.rss = max_rss()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        rss = max_rss()
+        _local.stack.pop()
+
+        record = {
+            "stage": self.name,
+            "parent": self.parent,
+            "start": round(self.start_time, 6),
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            # Growth of the process high-water mark; 0 when the stage stayed under an earlier peak
+            "peak_rss_delta_mb": rss_delta_mb(self.rss, rss),
+            "rows": self.shape[0] if self.shape else None,
+            "cols": self.shape[1] if self.shape and len(self.shape) > 1 else None,
+            "pid": os.getpid(),
+            "status": "error" if exc_type else "ok",
+        }
+        record.update(self.fields)
+        sink = _sink
+        if sink is not None:
+            sink(record)
+        return False
+
+
+class _NullStage:
+    def set_shape(self, shape):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, **fields):
+    # with stage("kmeans.pca") as s: ...; s.set_shape(result.shape)
+    if _sink is None:
+        return _NULL_STAGE
+    return _Stage(name, fields)
+
+def instrumented(name=None, shape=None):
+    # Records every call of the wrapped function as a stage; rows/cols come from the
+    # return value, or from shape(result) when the result has no shape of its own
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _sink is None:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, {}) as current:
+                result = func(*args, **kwargs)
+                current.set_shape(shape(result) if shape else _shape(result))
+            return result
+        return wrapper
+    return decorator
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV])
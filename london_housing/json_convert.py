@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+
+NULL_VALUES = (None, "", "null")
+
+FEATURES_TO_DROP = [
+    'fullAddress', 'postcode', 'country', 'outcode', 'history_date',
+    'saleEstimate_ingestedAt', 'saleEstimate_valueChange.saleDate',
+    'currentEnergyRating', 'history_percentageChange', 'history_numericChange'
+]
+
+
+# What to do with a missing value: keep it (null / no category), fill it, or reject the row
+KEEP = 'keep'
+REJECT = 'reject'
+
+# Declared schema of kaggle_london_house_price_data.csv: (kind, null rule) per kept column.
+# Every other column is dropped. The row stages below and the parallel parser in
+# ingest.py both apply these rules, so they clean a file to the same rows
+SCHEMA = {
+    'latitude': ('numeric', KEEP),
+    'longitude': ('numeric', KEEP),
+    'bathrooms': ('numeric', 0.0),
+    'bedrooms': ('numeric', 0.0),
+    'floorAreaSqM': ('numeric', REJECT),
+    'livingRooms': ('numeric', 0.0),
+    'tenure': ('categorical', 'Unknown'),
+    'propertyType': ('categorical', 'Unknown'),
+    'rentEstimate_lowerPrice': ('numeric', REJECT),
+    'rentEstimate_currentPrice': ('numeric', KEEP),
+    'rentEstimate_upperPrice': ('numeric', KEEP),
+    'saleEstimate_lowerPrice': ('numeric', KEEP),
+    'saleEstimate_currentPrice': ('numeric', KEEP),
+    'saleEstimate_upperPrice': ('numeric', KEEP),
+    'saleEstimate_confidenceLevel': ('categorical', KEEP),
+    'saleEstimate_valueChange.numericChange': ('numeric', KEEP),
+    'saleEstimate_valueChange.percentageChange': ('numeric', KEEP),
+    'history_price': ('numeric', KEEP),
+}
+
+
+# Row sources: every source yields one dict per listing
+def read_csv_rows(csv_file_path, rejected=None):
+    # Rows with the wrong number of fields are skipped. With a rejected list, they are
+    # recorded there and every row carries its line number ('_line') for later stages
+    with open(csv_file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        for row in reader:
+            if len(row) == len(header):
+                entry = dict(zip(header, row))
+                if rejected is not None:
+                    entry['_line'] = reader.line_num
+                yield entry
+            elif row and rejected is not None:
+                rejected.append((reader.line_num, None, f'expected {len(header)} fields, got {len(row)}', None))
+
+def read_json_rows(json_file_path):
+    # Loaded eagerly so a stage may write back to the file it reads from
+    with open(json_file_path, mode='r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    return iter(data)
+
+
+# Row-level stages: every stage takes an iterable of rows and yields rows
+def drop_features_stage(features_to_drop):
+    def stage(rows):
+        for entry in rows:
+            for feature in features_to_drop:
+                entry.pop(feature, None)
+            yield entry
+    return stage
+
+def remove_null_stage(column):
+    def stage(rows):
+        for entry in rows:
+            if entry[column] not in NULL_VALUES:
+                yield entry
+    return stage
+
+remove_null_floor_area_stage = remove_null_stage('floorAreaSqM')
+remove_null_rent_estimate_stage = remove_null_stage('rentEstimate_lowerPrice')
+
+def replace_null_values_stage(rows, schema=SCHEMA):
+    defaults = {name: on_null for name, (_, on_null) in schema.items() if on_null not in (KEEP, REJECT)}
+    for entry in rows:
+        for feature, default in defaults.items():
+            if entry[feature] in NULL_VALUES:
+                entry[feature] = default
+        yield entry
+
+def _to_number(value):
+    number = float(value)
+    # NaN is kept as a missing value, which JSON writes as null
+    return None if number != number else number
+
+def schema_stage(schema=SCHEMA, rejected=None):
+    # All of SCHEMA in one pass: keep only its columns, fill or reject missing values and
+    # parse numbers. A row is rejected for every rule it breaks, as ingest reports it
+    def stage(rows):
+        for entry in rows:
+            line = entry.pop('_line', None)
+            row, reasons = {}, []
+            for name, (kind, on_null) in schema.items():
+                value = entry.get(name)
+                if value in NULL_VALUES:
+                    if on_null == REJECT:
+                        reasons.append((name, 'missing', value))
+                    row[name] = None if on_null in (KEEP, REJECT) else on_null
+                elif kind == 'numeric':
+                    try:
+                        row[name] = _to_number(value)
+                    except (TypeError, ValueError):
+                        reasons.append((name, 'not a number', value))
+                else:
+                    row[name] = str(value)
+            if not reasons:
+                yield row
+            elif rejected is not None:
+                rejected.extend((line, name, reason, value) for name, reason, value in reasons)
+    return stage
+
+def cleaning_stages(schema=SCHEMA, rejected=None):
+    return [schema_stage(schema, rejected)]
+
+
+def run_pipeline(rows, stages, json_file_path=None, csv_file_path=None):
+    # Rows flow through every stage one at a time, so memory stays constant
+    for stage in stages:
+        rows = stage(rows)
+
+    json_file = csv_file = csv_writer = None
+    count = 0
+    try:
+        if json_file_path:
+            json_file = open(json_file_path, mode='w', encoding='utf-8')
+            json_file.write('[')
+        if csv_file_path:
+            csv_file = open(csv_file_path, mode='w', encoding='utf-8', newline='')
+            csv_writer = csv.writer(csv_file)
+
+        for entry in rows:
+            if json_file:
+                json_file.write(',\n' if count else '\n')
+                json_file.write(json.dumps(entry))
+            if csv_writer:
+                if not count:
+                    csv_writer.writerow(entry.keys())  # Write headers
+                csv_writer.writerow(entry.values())
+            count += 1
+
+        if json_file:
+            json_file.write('\n]\n')
+    finally:
+        if json_file:
+            json_file.close()
+        if csv_file:
+            csv_file.close()
+    return count
+
+
+# Single-step wrappers kept for ad-hoc use of the individual cleaning steps
+def csv_to_json(csv_file_path, json_file_path):
+    run_pipeline(read_csv_rows(csv_file_path), [], json_file_path=json_file_path)
+
+def drop_features(json_file_path, output_file_path, features_to_drop):
+    run_pipeline(read_json_rows(json_file_path), [drop_features_stage(features_to_drop)],
+                 json_file_path=output_file_path)
+
+def remove_null_floor_area(json_file_path, output_file_path):
+    run_pipeline(read_json_rows(json_file_path), [remove_null_floor_area_stage],
+                 json_file_path=output_file_path)
+
+def replace_null_values(json_file_path, output_file_path):
+    run_pipeline(read_json_rows(json_file_path), [replace_null_values_stage],
+                 json_file_path=output_file_path)
+
+def remove_null_rent_estimate(json_file_path, output_file_path):
+    run_pipeline(read_json_rows(json_file_path), [remove_null_rent_estimate_stage],
+                 json_file_path=output_file_path)
+
+def json_to_csv(json_file_path, csv_file_path):
+    run_pipeline(read_json_rows(json_file_path), [], csv_file_path=csv_file_path)
+
+# Example usage
+if __name__ == "__main__":
+    from .data_cache import build_cache
+    from .ingest import rejected_frame, rejection_summary
+
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    csv_file = os.path.join(project_dir, 'kaggle_london_house_price_data.csv')
+    final_json_file = os.path.join(project_dir, 'final_clean_data.json')
+    final_csv_file = os.path.join(project_dir, 'final_clean_data.csv')
+    rejected_file = os.path.join(project_dir, 'rejected_rows.csv')
+
+    # Read the raw CSV once and write both cleaned outputs in a single pass; only the
+    # rejected rows are collected
+    rejected = []
+    final_count = run_pipeline(
+        read_csv_rows(csv_file, rejected), cleaning_stages(rejected=rejected),
+        json_file_path=final_json_file, csv_file_path=final_csv_file
+    )
+    rejected = rejected_frame(rejected)
+    rejected.to_csv(rejected_file, index=False)
+    print(rejection_summary(rejected).to_string(index=False))
+
+    # Print final data entries count
+    print(f"Final number of data entries: {final_count}")
+
+    # Typed columnar cache shared by every analysis loader
+    build_cache(final_json_file)
@@ -0,0 +1,271 @@
+import pickle
+import pandas as pd
+import numpy as np
+from .data_cache import iter_chunks, load_frame
+from .features import FeatureMatrixBuilder, encode_frame, memory_report, to_dense
+from .instrumentation import instrumented, stage
+from .plotting import finish_figure, plot_density
+
+
+@instrumented("kmeans.reduce_dimensions")
+def reduce_dimensions(data, n_components=10, pca=None):
+    from sklearn.decomposition import PCA
+    pca = pca or PCA(n_components=n_components)
+    reduced_data = pca.fit_transform(data)
+    print(f"Reduced data shape: {reduced_data.shape}")
+    print(
+        f"Explained Variance Ratio for {n_components} components: {sum(pca.explained_variance_ratio_)}"
+    )
+    return reduced_data
+
+
+def inspect_pca_components(data, n_components=10):
+    from sklearn.decomposition import PCA
+    pca = PCA(n_components=n_components)
+    pca.fit(data)
+    print("Explained Variance Ratio:", pca.explained_variance_ratio_)
+    print("PCA Components (contributions of each feature):")
+    print(
+        pd.DataFrame(
+            pca.components_, columns=[f"Feature {i}" for i in range(data.shape[1])]
+        )
+    )
+
+
+@instrumented("kmeans.determine_optimal_clusters")
+def determine_optimal_clusters(data, max_k=10, seeds=(42,), n_jobs=None, patience=None, show=True):
+    # k values and seeds are evaluated in parallel worker processes
+    from .model_selection import sweep_k
+    results = sweep_k(data, k_values=range(2, max_k + 1), seeds=seeds, n_jobs=n_jobs, patience=patience)
+    print("Model Selection Results:")
+    print(results)
+
+    # Plot the Elbow Method graph with the silhouette score on a second axis
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(results.index, results["inertia"], marker="o", label="Distortion")
+    ax.set_xlabel("Number of Clusters")
+    ax.set_ylabel("Distortion")
+    silhouette_ax = ax.twinx()
+    silhouette_ax.plot(results.index, results["silhouette"], marker="s", color="tab:orange", label="Silhouette")
+    silhouette_ax.set_ylabel("Silhouette Score")
+    fig.legend(loc="upper right")
+    plt.title("Elbow Method")
+    if show:
+        finish_figure("kmeans_elbow")
+
+    return results
+
+
+class OptimizedKMeansClustering:
+    def __init__(self, n_clusters=3):
+        from sklearn.cluster import MiniBatchKMeans
+        self.n_clusters = n_clusters
+        self.model = MiniBatchKMeans(
+            n_clusters=self.n_clusters, batch_size=2000, random_state=42
+        )
+        self.df = None
+        self.source_path = None
+        self.builder = None
+        self.matrix = None
+        self.pca = None
+        self.memory = None
+        self.cluster_summary = None
+        self.model_selection = None
+        self.sample_index = None
+
+    @instrumented()
+    def load_json_data(self, json_file_path):
+        self.df = load_frame(json_file_path)
+        self.source_path = json_file_path
+        print(f"Data loaded. DataFrame shape: {self.df.shape}")
+        return self.df
+
+    @instrumented()
+    def preprocess_data(self):
+        # Shared float32 encoding of numeric and categorical columns (cached on disk)
+        matrix, self.builder = encode_frame(self.df, self.source_path)
+        self.memory = memory_report(self.df, matrix)
+        # The encoded matrix is kept for clustering; the frame is for the cluster summary
+        self.matrix = matrix
+        self.df = self.builder.to_frame(matrix)
+
+        print("Data preprocessed with One-Hot Encoding.")
+        print(f"Encoded Data Shape: {self.df.shape}")
+        return self.df
+
+    @instrumented()
+    def fit(self, data):
+        self.model.fit(data)
+        return self.model.labels_
+
+    @instrumented()
+    def reduce_and_cluster(self, n_jobs=None, sample_size=10000):
+        from sklearn.decomposition import PCA
+
+        # Take a subset for clustering (at most sample_size rows; None uses every row)
+        if sample_size is None:
+            subset_df = self.df.copy()
+        else:
+            subset_df = self.df.sample(n=min(sample_size, len(self.df)), random_state=42)
+        print(f"Subset Data Shape: {subset_df.shape}")
+
+        # Scale data (a sparse encoding stays CSR through scaling and PCA)
+        scaled_data = self.builder.scale(self.matrix[self.df.index.get_indexer(subset_df.index)])
+
+        # Inspect PCA components
+        inspect_pca_components(scaled_data, n_components=10)
+
+        # Reduce dimensions (the fitted PCA is kept so new rows can be assigned later)
+        self.pca = PCA(n_components=10)
+        reduced_data = reduce_dimensions(scaled_data, n_components=10, pca=self.pca)
+
+        # Determine optimal number of clusters using Elbow Method
+        self.model_selection = determine_optimal_clusters(reduced_data, max_k=10, n_jobs=n_jobs)
+
+        # Cluster
+        labels = self.fit(reduced_data)
+        print("Clustering completed.")
+
+        # Visualization (Using first 2 PCA components for simplicity)
+        plot_density(
+            reduced_data[:, 0], reduced_data[:, 1], labels, name="kmeans_clusters",
+            title="KMeans Clustering Visualization (First 2 PCA Components)",
+            xlabel="Principal Component 1", ylabel="Principal Component 2",
+        )
+
+        # Analyze each cluster
+        self.sample_index = subset_df.index
+        subset_df["Cluster"] = labels
+        self.cluster_summary = subset_df.groupby("Cluster").mean()
+        print("Cluster Summary:")
+        print(self.cluster_summary)
+
+        return labels
+
+    @instrumented()
+    def fit_streaming(self, json_file_path, chunk_size=20000, n_components=10, n_epochs=1):
+        # Out-of-core variant of reduce_and_cluster: every row is used, but only
+        # one chunk of the dataset is ever held in memory at a time
+        from sklearn.decomposition import IncrementalPCA
+
+        self.source_path = json_file_path
+        self.builder = FeatureMatrixBuilder()
+        self.pca = IncrementalPCA(n_components=n_components)
+
+        def chunks():
+            return iter_chunks(json_file_path, chunk_size=chunk_size)
+
+        # Pass 1: encoder categories and scaler ranges
+        n_rows = 0
+        with stage("kmeans.streaming.fit_encoder") as current:
+            for chunk in chunks():
+                self.builder.partial_fit(chunk)
+                n_rows += len(chunk)
+            current.set_shape((n_rows, len(chunk.columns)))
+        print(f"Streaming over {n_rows} rows in chunks of {chunk_size}.")
+
+        # Pass 2: incremental PCA on the scaled chunks
+        with stage("kmeans.streaming.fit_pca") as current:
+            for chunk in chunks():
+                self.pca.partial_fit(to_dense(self.builder.scale(self.builder.transform(chunk))))
+            current.set_shape((n_rows, len(self.builder.feature_names_)))
+        print(
+            f"Explained Variance Ratio for {n_components} components: {sum(self.pca.explained_variance_ratio_)}"
+        )
+
+        def reduced_chunks():
+            for chunk in chunks():
+                matrix = to_dense(self.builder.transform(chunk))
+                yield chunk.index, matrix, self.pca.transform(self.builder.scale(matrix))
+
+        # Pass 3: MiniBatchKMeans trained on mini-batches drawn from every chunk
+        rng = np.random.default_rng(42)
+        batch_size = self.model.batch_size
+        with stage("kmeans.streaming.fit_kmeans", epochs=n_epochs) as current:
+            for _ in range(n_epochs):
+                for _, _, reduced in reduced_chunks():
+                    order = rng.permutation(len(reduced))
+                    for start in range(0, len(order), batch_size):
+                        batch = reduced[order[start:start + batch_size]]
+                        if len(batch) >= self.n_clusters:
+                            self.model.partial_fit(batch)
+            current.set_shape((n_rows, n_components))
+
+        # Pass 4: assign labels and accumulate per-cluster sums for the summary
+        labels = np.empty(n_rows, dtype=np.int32)
+        sums = np.zeros((self.n_clusters, len(self.builder.feature_names_)))
+        counts = np.zeros(self.n_clusters, dtype=np.int64)
+        with stage("kmeans.streaming.assign") as current:
+            for index, matrix, reduced in reduced_chunks():
+                chunk_labels = self.model.predict(reduced)
+                labels[index.start:index.stop] = chunk_labels
+                indicator = (chunk_labels == np.arange(self.n_clusters)[:, None]).astype(np.float64)
+                sums += indicator @ matrix
+                counts += np.bincount(chunk_labels, minlength=self.n_clusters)
+            current.set_shape((n_rows, len(self.builder.feature_names_)))
+        print("Clustering completed.")
+
+        self.sample_index = pd.RangeIndex(n_rows)
+        self.cluster_summary = pd.DataFrame(
+            sums / np.maximum(counts, 1)[:, None], columns=self.builder.feature_names_
+        )
+        self.cluster_summary.index.name = "Cluster"
+        print("Cluster Summary:")
+        print(self.cluster_summary)
+
+        return labels
+
+    def transform(self, df):
+        # Cleaned rows -> (encoded matrix, PCA-reduced matrix) with the fitted pipeline
+        matrix = self.builder.transform(df)
+        return matrix, self.pca.transform(self.builder.scale(matrix))
+
+    def predict(self, df):
+        return self.model.predict(self.transform(df)[1])
+
+    def save(self, path):
+        # Fitted encoder/scaler, PCA and MiniBatchKMeans; the data itself is not stored
+        with open(path, "wb") as f:
+            pickle.dump({"n_clusters": self.n_clusters, "builder": self.builder,
+                         "pca": self.pca, "model": self.model}, f)
+
+    def export(self, path):
+        # Compact numpy-only copy of the pipeline for cluster_service.py
+        from .cluster_service import ClusterModel
+        ClusterModel.from_pipeline(self).save(path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        kmeans = cls(n_clusters=state["n_clusters"])
+        kmeans.builder = state["builder"]
+        kmeans.pca = state["pca"]
+        kmeans.model = state["model"]
+        return kmeans
+
+
+# Usage example
+if __name__ == "__main__":
+    json_file_path = "final_clean_data.json"
+
+    # Cluster every row out-of-core instead of a 10,000-row sample
+    streaming = False
+
+    # Initialize clustering class
+    kmeans = OptimizedKMeansClustering(n_clusters=5)  # Set optimal number of clusters
+
+    if streaming:
+        labels = kmeans.fit_streaming(json_file_path, chunk_size=20000)
+    else:
+        # Load and preprocess data
+        df = kmeans.load_json_data(json_file_path)
+        df = kmeans.preprocess_data()
+
+        # Perform clustering on a 10,000-row subset
+        labels = kmeans.reduce_and_cluster()
+
+    # Persist the fitted pipeline for incremental.py and cluster_service.py
+    kmeans.save("kmeans_model.pkl")
+    kmeans.export("kmeans_model.npz")
@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .shared_array import SharedArray, attach, single_threaded
+
+
+def _evaluate_k(descriptor, k, seed, batch_size, silhouette_sample_size):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import calinski_harabasz_score, silhouette_score
+
+    data = attach(descriptor)
+
+    with single_threaded():
+        model = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, random_state=seed)
+        labels = model.fit_predict(data)
+        silhouette = silhouette_score(
+            data, labels, sample_size=min(silhouette_sample_size, len(data)), random_state=seed
+        )
+        calinski_harabasz = calinski_harabasz_score(data, labels)
+
+    return {
+        "k": k,
+        "seed": seed,
+        "inertia": model.inertia_,
+        "silhouette": silhouette,
+        "calinski_harabasz": calinski_harabasz,
+    }
+
+
+def sweep_k(data, k_values=range(2, 11), seeds=(42,), n_jobs=None, batch_size=2000,
+            silhouette_sample_size=5000, patience=None):
+    k_values = list(k_values)
+    n_jobs = n_jobs or os.cpu_count()
+    runs = []
+    best_silhouette, since_best = -np.inf, 0
+
+    with SharedArray(data) as shared, ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        # k values are submitted in rounds of about n_jobs tasks so early stopping
+        # can skip the rounds that are no longer needed
+        round_size = max(1, n_jobs // len(seeds))
+        for start in range(0, len(k_values), round_size):
+            round_k = k_values[start:start + round_size]
+            futures = [
+                pool.submit(_evaluate_k, shared.descriptor, k, seed, batch_size, silhouette_sample_size)
+                for k in round_k
+                for seed in seeds
+            ]
+            round_runs = [future.result() for future in futures]
+            runs += round_runs
+
+            if patience is None:
+                continue
+            stop = False
+            for k in round_k:
+                silhouette = np.mean([run["silhouette"] for run in round_runs if run["k"] == k])
+                if silhouette > best_silhouette:
+                    best_silhouette, since_best = silhouette, 0
+                else:
+                    since_best += 1
+                if since_best >= patience:
+                    stop = True
+                    break
+            if stop:
+                print(f"Early stopping after k={round_k[-1]}: silhouette stopped improving.")
+                break
+
+    # One row per k, averaged over the seeds
+    runs = pd.DataFrame(runs)
+    table = runs.groupby("k").agg(
+        inertia=("inertia", "mean"),
+        silhouette=("silhouette", "mean"),
+        silhouette_std=("silhouette", "std"),
+        calinski_harabasz=("calinski_harabasz", "mean"),
+        n_seeds=("seed", "count"),
+    )
+    return table
@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+# matplotlib is imported inside the drawing functions: jobs that never plot (and pool
+# workers) do not pay for it
+
+# When set, figures are written here as PNG files instead of opening a window
+_output_dir = None
+
+
+def set_output_dir(output_dir):
+    global _output_dir
+    _output_dir = output_dir
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+
+def finish_figure(name):
+    import matplotlib.pyplot as plt
+    if _output_dir is None:
+        plt.show()
+        return None
+    path = os.path.join(_output_dir, f"{name}.png")
+    plt.savefig(path, dpi=120, bbox_inches="tight")
+    plt.close("all")
+    return path
+
+
+class DensityRaster:
+    # Points binned onto a fixed pixel grid, counted per pixel and per label. The grid is
+    # dense (total counts) but the per-label counts are sparse, so memory depends on the
+    # image size and the number of occupied (pixel, label) pairs, never on the point count
+    def __init__(self, extent, bins=500):
+        self.x_min, self.x_max, self.y_min, self.y_max = (float(value) for value in extent)
+        self.bins = bins
+        self.total = np.zeros(bins * bins, dtype=np.int64)
+        self.counts = sparse.csr_matrix((bins * bins, 1), dtype=np.int64)
+
+    def pixels(self, x, y):
+        # Flat pixel index of every point, -1 for points outside the extent or not finite
+        scale_x = self.bins / max(self.x_max - self.x_min, np.finfo(float).tiny)
+        scale_y = self.bins / max(self.y_max - self.y_min, np.finfo(float).tiny)
+        with np.errstate(invalid='ignore'):
+            column = np.floor((x - self.x_min) * scale_x)
+            row = np.floor((y - self.y_min) * scale_y)
+            # The maximum belongs to the last pixel, not one past it
+            column[x == self.x_max] = self.bins - 1
+            row[y == self.y_max] = self.bins - 1
+            inside = (column >= 0) & (column < self.bins) & (row >= 0) & (row < self.bins)
+        pixels = np.full(len(x), -1, dtype=np.int64)
+        pixels[inside] = row[inside].astype(np.int64) * self.bins + column[inside].astype(np.int64)
+        return pixels
+
+    def update(self, x, y, codes=None):
+        # codes: non-negative label codes (0 for every point when None)
+        pixels = self.pixels(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        inside = pixels >= 0
+        pixels = pixels[inside]
+        codes = np.zeros(len(pixels), dtype=np.int64) if codes is None else np.asarray(codes)[inside]
+        self.total += np.bincount(pixels, minlength=len(self.total))
+        if not len(pixels):
+            return self
+
+        n_labels = max(self.counts.shape[1], int(codes.max()) + 1)
+        if n_labels > self.counts.shape[1]:
+            self.counts.resize((len(self.total), n_labels))
+        chunk = sparse.coo_matrix((np.ones(len(pixels), dtype=np.int64), (pixels, codes)),
+                                  shape=(len(self.total), n_labels))
+        self.counts = self.counts + chunk.tocsr()
+        return self
+
+    def dominant(self):
+        # Most frequent label code per pixel (meaningless where total is 0)
+        counts = self.counts.tocoo()
+        dominant = np.zeros(len(self.total), dtype=np.int64)
+        # Sorted by pixel, count, then descending label: the last entry of every pixel is
+        # its most frequent label (the lowest one on ties)
+        order = np.lexsort((-counts.col, counts.data, counts.row))
+        last = order[np.flatnonzero(np.diff(counts.row[order], append=-1))]
+        dominant[counts.row[last]] = counts.col[last]
+        return dominant
+
+    def image(self, colors, background=(1.0, 1.0, 1.0)):
+        # RGB image: each pixel takes the color of its dominant label, faded towards the
+        # background by log density so sparse areas stay visible next to dense ones
+        colors = np.asarray(colors, dtype=np.float64)[:, :3]
+        density = np.log1p(self.total) / np.log1p(max(self.total.max(), 1))
+        # Keep every occupied pixel distinguishable from empty space
+        density = np.where(self.total > 0, np.maximum(density, 0.25), 0.0)
+        background = np.asarray(background, dtype=np.float64)
+        rgb = background + density[:, None] * (colors[self.dominant()] - background)
+        return rgb.reshape(self.bins, self.bins, 3)
+
+
+def data_extent(x, y, chunk_size=1_000_000):
+    # Finite min/max of both axes, read a chunk at a time (works on memory-mapped columns)
+    bounds = [np.inf, -np.inf, np.inf, -np.inf]
+    for start in range(0, len(x), chunk_size):
+        for offset, values in ((0, x[start:start + chunk_size]), (2, y[start:start + chunk_size])):
+            values = np.asarray(values, dtype=np.float64)
+            values = values[np.isfinite(values)]
+            if len(values):
+                bounds[offset] = min(bounds[offset], values.min())
+                bounds[offset + 1] = max(bounds[offset + 1], values.max())
+    if not np.isfinite(bounds).all():
+        return (0.0, 1.0, 0.0, 1.0)
+    return tuple(bounds)
+
+
+def plot_density(x, y, labels=None, name='density', title=None, xlabel=None, ylabel=None, cmap='viridis',
+                 bins=500, extent=None, noise_label=-1, noise_color='lightgrey', chunk_size=1_000_000,
+                 figsize=(8, 6)):
+    # Density raster replacing plt.scatter: points are binned chunk by chunk, so drawing
+    # a million points costs a few bincounts and one imshow instead of a million markers
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
+    from matplotlib import colors as mcolors
+
+    extent = data_extent(x, y, chunk_size) if extent is None else extent
+    raster = DensityRaster(extent, bins)
+    values = np.zeros(1, dtype=np.int64) if labels is None else np.unique(np.asarray(labels))
+    for start in range(0, len(x), chunk_size):
+        stop = start + chunk_size
+        codes = None if labels is None else np.searchsorted(values, np.asarray(labels[start:stop]))
+        raster.update(x[start:stop], y[start:stop], codes)
+
+    clusters = values[values != noise_label]
+    norm = mcolors.Normalize(vmin=clusters.min() if len(clusters) else 0,
+                             vmax=clusters.max() if len(clusters) else 1)
+    mapper = cm.ScalarMappable(norm=norm, cmap=cmap)
+    colors = mapper.to_rgba(values)
+    colors[values == noise_label] = mcolors.to_rgba(noise_color)
+
+    plt.figure(figsize=figsize)
+    plt.imshow(raster.image(colors), extent=(raster.x_min, raster.x_max, raster.y_min, raster.y_max),
+               origin='lower', aspect='auto', interpolation='nearest')
+    if labels is not None:
+        plt.colorbar(mapper, ax=plt.gca(), label='Cluster')
+    if title:
+        plt.title(title)
+    if xlabel:
+        plt.xlabel(xlabel)
+    if ylabel:
+        plt.ylabel(ylabel)
+    return finish_figure(name)
+
+
+def plot_dendrogram(linkage_matrix, name='dendrogram', p=30, title='Dendrogram', figsize=(10, 7)):
+    # Only the last p merges are drawn; each leaf is a merged cluster labelled with its size
+    import matplotlib.pyplot as plt
+    import scipy.cluster.hierarchy as sch
+
+    plt.figure(figsize=figsize)
+    sch.dendrogram(linkage_matrix, truncate_mode='lastp', p=p)
+    plt.title(title)
+    plt.xlabel('Cluster size')
+    plt.ylabel('Distance')
+    return finish_figure(name)
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import default_cache_dir, ensure_cache
+from .shared_array import SharedArray, attach
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def combine_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    # Chan et al. pairwise update of count, mean and sum of squared deviations
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(count > 0, count_b / count, 0.0)
+    mean = mean_a + delta * weight
+    m2 = m2_a + m2_b + delta ** 2 * count_a * weight
+    return count, mean, m2
+
+
+class ProfileAccumulator:
+    # Mergeable per-cluster statistics: moments, extremes and a histogram for every numeric
+    # column (bins shared by all workers), category counts for every categorical column
+    def __init__(self, n_clusters, edges, n_categories):
+        n_numeric = len(edges)
+        self.edges = edges
+        self.size = np.zeros(n_clusters, dtype=np.int64)
+        self.count = np.zeros((n_clusters, n_numeric), dtype=np.int64)
+        self.mean = np.zeros((n_clusters, n_numeric))
+        self.m2 = np.zeros((n_clusters, n_numeric))
+        self.min = np.full((n_clusters, n_numeric), np.inf)
+        self.max = np.full((n_clusters, n_numeric), -np.inf)
+        # Count and value sum per bin: each bin acts as a centroid, as in a t-digest
+        self.histograms = [np.zeros((n_clusters, len(e) - 1), dtype=np.int64) for e in edges]
+        self.bin_sums = [np.zeros((n_clusters, len(e) - 1)) for e in edges]
+        self.categories = [np.zeros((n_clusters, n + 1), dtype=np.int64) for n in n_categories]
+
+    @property
+    def n_clusters(self):
+        return len(self.count)
+
+    def update(self, codes, numeric, categorical):
+        # codes: cluster position per row; numeric: (rows, columns) floats with NaN
+        # for missing; categorical: list of category code arrays (-1 for missing)
+        n_clusters = self.n_clusters
+        self.size += np.bincount(codes, minlength=n_clusters)
+        for j, values in enumerate(numeric.T):
+            valid = ~np.isnan(values)
+            labels, values = codes[valid], values[valid]
+            count = np.bincount(labels, minlength=n_clusters)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.bincount(labels, weights=values, minlength=n_clusters) / count
+            mean = np.nan_to_num(mean)
+            m2 = np.bincount(labels, weights=(values - mean[labels]) ** 2, minlength=n_clusters)
+            self.count[:, j], self.mean[:, j], self.m2[:, j] = combine_moments(
+                self.count[:, j], self.mean[:, j], self.m2[:, j], count, mean, m2)
+            np.minimum.at(self.min[:, j], labels, values)
+            np.maximum.at(self.max[:, j], labels, values)
+
+            n_bins = self.histograms[j].shape[1]
+            bins = np.clip(np.searchsorted(self.edges[j], values, side='right') - 1, 0, n_bins - 1)
+            slots = labels * n_bins + bins
+            self.histograms[j] += np.bincount(slots, minlength=n_clusters * n_bins).reshape(n_clusters, n_bins)
+            self.bin_sums[j] += np.bincount(slots, weights=values, minlength=n_clusters * n_bins).reshape(
+                n_clusters, n_bins)
+
+        # Missing categories are counted in the last slot
+        for counts, values in zip(self.categories, categorical):
+            width = counts.shape[1]
+            values = np.where(values < 0, width - 1, values)
+            counts += np.bincount(codes * width + values, minlength=n_clusters * width).reshape(n_clusters, width)
+        return self
+
+    def merge(self, other):
+        self.count, self.mean, self.m2 = combine_moments(
+            self.count, self.mean, self.m2, other.count, other.mean, other.m2)
+        self.size += other.size
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        for histogram, other_histogram in zip(self.histograms, other.histograms):
+            histogram += other_histogram
+        for bin_sums, other_bin_sums in zip(self.bin_sums, other.bin_sums):
+            bin_sums += other_bin_sums
+        for counts, other_counts in zip(self.categories, other.categories):
+            counts += other_counts
+        return self
+
+    def total(self):
+        # Every cluster folded into one row, for the whole-dataset profile
+        total = ProfileAccumulator(1, self.edges, [c.shape[1] - 1 for c in self.categories])
+        for cluster in range(self.n_clusters):
+            total.count[0], total.mean[0], total.m2[0] = combine_moments(
+                total.count[0], total.mean[0], total.m2[0],
+                self.count[cluster], self.mean[cluster], self.m2[cluster])
+        total.size[0] = self.size.sum()
+        total.min[0] = self.min.min(axis=0)
+        total.max[0] = self.max.max(axis=0)
+        total.histograms = [h.sum(axis=0, keepdims=True) for h in self.histograms]
+        total.bin_sums = [s.sum(axis=0, keepdims=True) for s in self.bin_sums]
+        total.categories = [c.sum(axis=0, keepdims=True) for c in self.categories]
+        return total
+
+    def quantiles(self, cluster, column, quantiles=QUANTILES):
+        # Mean value of the bin holding each quantile; exact for discrete columns and
+        # within one bin width (about 1/n_bins of the mass) otherwise
+        histogram = self.histograms[column][cluster]
+        total = histogram.sum()
+        if total == 0:
+            return [None] * len(quantiles)
+        cumulative = np.cumsum(histogram)
+        targets = np.maximum(np.asarray(quantiles) * total, 1)
+        bins = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(histogram) - 1)
+        return (self.bin_sums[column][cluster, bins] / histogram[bins]).tolist()
+
+
+def histogram_edges(values, n_bins=512):
+    # Bin edges at sample quantiles: dense where the data is, like a t-digest's centroids
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.array([0.0, 1.0])
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)))
+    # Bins are half-open, so the maximum gets a bin of its own
+    return np.append(edges, np.nextafter(edges[-1], np.inf))
+
+
+def _read_block(cache_dir, numeric_columns, categorical_columns, rows):
+    # Fancy indexing on the memory map only touches the pages holding `rows`
+    numeric = np.empty((len(rows), len(numeric_columns)))
+    for j, column in enumerate(numeric_columns):
+        numeric[:, j] = np.load(os.path.join(cache_dir, column['file']), mmap_mode='r')[rows]
+    categorical = [
+        np.load(os.path.join(cache_dir, column['file']), mmap_mode='r')[rows].astype(np.int64)
+        for column in categorical_columns
+    ]
+    return numeric, categorical
+
+def _profile_range(cache_dir, numeric_columns, categorical_columns, rows_descriptor, codes_descriptor,
+                   start, stop, edges, n_clusters):
+    rows = attach(rows_descriptor)[start:stop]
+    codes = attach(codes_descriptor)[start:stop]
+    numeric, categorical = _read_block(cache_dir, numeric_columns, categorical_columns, rows)
+    accumulator = ProfileAccumulator(n_clusters, edges, [len(c['categories']) for c in categorical_columns])
+    return accumulator.update(codes, numeric, categorical)
+
+
+def profile_clusters(source_path, labels, rows=None, chunk_size=50000, n_jobs=None,
+                     n_bins=512, edge_sample_size=100000, cache_dir=None):
+    # labels[i] is the cluster of cache row rows[i] (all rows when rows is None)
+    cache_dir = cache_dir or default_cache_dir(source_path)
+    manifest = ensure_cache(source_path, cache_dir)
+    labels = np.asarray(labels)
+    rows = np.arange(manifest['n_rows']) if rows is None else np.asarray(rows, dtype=np.int64)
+    if len(rows) != len(labels):
+        raise ValueError(f"{len(labels)} labels for {len(rows)} rows")
+
+    # Sorted rows keep every chunk's reads close together in the column files
+    order = np.argsort(rows, kind='stable')
+    rows = rows[order]
+    cluster_ids, codes = np.unique(labels[order], return_inverse=True)
+    codes = codes.astype(np.int64)
+
+    numeric_columns = [c for c in manifest['columns'] if c['kind'] != 'categorical']
+    categorical_columns = [c for c in manifest['columns'] if c['kind'] == 'categorical']
+    sample = np.sort(np.random.default_rng(0).choice(rows, min(edge_sample_size, len(rows)), replace=False))
+    sample_numeric, _ = _read_block(cache_dir, numeric_columns, [], sample)
+    edges = [histogram_edges(values, n_bins) for values in sample_numeric.T]
+
+    bounds = list(range(0, len(rows), chunk_size)) + [len(rows)]
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    n_categories = [len(c['categories']) for c in categorical_columns]
+    accumulator = ProfileAccumulator(len(cluster_ids), edges, n_categories)
+
+    if n_jobs == 1:
+        for start, stop in ranges:
+            numeric, categorical = _read_block(cache_dir, numeric_columns, categorical_columns, rows[start:stop])
+            accumulator.update(codes[start:stop], numeric, categorical)
+    else:
+        with SharedArray(rows) as shared_rows, SharedArray(codes) as shared_codes, \
+                ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+            futures = [
+                pool.submit(_profile_range, cache_dir, numeric_columns, categorical_columns,
+                            shared_rows.descriptor, shared_codes.descriptor, start, stop, edges, len(cluster_ids))
+                for start, stop in ranges
+            ]
+            for future in futures:
+                accumulator.merge(future.result())
+
+    return build_report(source_path, accumulator, cluster_ids, numeric_columns, categorical_columns)
+
+
+def _profile(accumulator, cluster, numeric_columns, categorical_columns):
+    numeric = {}
+    for j, column in enumerate(numeric_columns):
+        count = int(accumulator.count[cluster, j])
+        numeric[column['name']] = {
+            'count': count,
+            'mean': float(accumulator.mean[cluster, j]) if count else None,
+            'std': float(np.sqrt(accumulator.m2[cluster, j] / (count - 1))) if count > 1 else None,
+            'min': float(accumulator.min[cluster, j]) if count else None,
+            'max': float(accumulator.max[cluster, j]) if count else None,
+            'quantiles': dict(zip(map(str, QUANTILES), accumulator.quantiles(cluster, j))),
+        }
+    categorical = {}
+    for counts, column in zip(accumulator.categories, categorical_columns):
+        counts = counts[cluster]
+        shares = counts / max(counts.sum(), 1)
+        categorical[column['name']] = {
+            category: {'count': int(count), 'share': float(share)}
+            for category, count, share in zip(column['categories'] + [None], counts, shares)
+            if count
+        }
+    return {'numeric': numeric, 'categorical': categorical}
+
+def build_report(source_path, accumulator, cluster_ids, numeric_columns, categorical_columns):
+    clusters = []
+    for cluster, cluster_id in enumerate(cluster_ids):
+        clusters.append({'cluster': int(cluster_id), 'size': int(accumulator.size[cluster]),
+                         **_profile(accumulator, cluster, numeric_columns, categorical_columns)})
+    return {
+        'source': os.path.abspath(source_path),
+        'n_rows': int(accumulator.size.sum()),
+        'quantiles': list(QUANTILES),
+        'overall': _profile(accumulator.total(), 0, numeric_columns, categorical_columns),
+        'clusters': clusters,
+    }
+
+def write_report(report, path):
+    with open(path, mode='w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=1)
+
+def summary_frame(report, statistic='mean'):
+    # One row per cluster, one column per numeric feature, like groupby('Cluster').mean()
+    return pd.DataFrame(
+        [{name: stats[statistic] for name, stats in c['numeric'].items()} for c in report['clusters']],
+        index=pd.Index([c['cluster'] for c in report['clusters']], name='Cluster'),
+    )
+
+
+def load_labels(labels_path):
+    # labels.npy with one label per cache row, or main.py's labels.csv (row, cluster)
+    if labels_path.endswith('.npy'):
+        return np.load(labels_path), None
+    labels = pd.read_csv(labels_path)
+    return labels['cluster'].to_numpy(), labels['row'].to_numpy()
+
+
+# Example usage
+if __name__ == "__main__":
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Per-cluster profile of the full dataset")
+    parser.add_argument("labels", help="labels.npy (one per row) or labels.csv with row and cluster columns")
+    parser.add_argument("--data", default=os.path.join(project_dir, "final_clean_data.json"))
+    parser.add_argument("--output", default="cluster_profile.json")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--jobs", type=int)
+    args = parser.parse_args()
+
+    labels, rows = load_labels(args.labels)
+    report = profile_clusters(args.data, labels, rows=rows, chunk_size=args.chunk_size, n_jobs=args.jobs)
+    write_report(report, args.output)
+    print(summary_frame(report))
+    print(f"Report written to {args.output}")
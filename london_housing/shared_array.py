@@ -0,0 +1,45 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Segments already attached in this (worker) process, keyed by segment name
+_attached = {}
+
+
+class SharedArray:
+    # Copies an array once into shared memory; workers map it without copying
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)
+        self.array[...] = array
+        self.descriptor = (self.shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(descriptor):
+    name, shape, dtype = descriptor
+    if name not in _attached:
+        # Workers are children of the owner and share its resource tracker,
+        # so attaching here never unlinks the segment behind the owner's back
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_attached[name].buf)
+    array.flags.writeable = False
+    return array
+
+
+def single_threaded():
+    # For work running in pool workers: the processes already share the cores between
+    # them, so BLAS/OpenMP inside each one is kept to a single thread
+    from threadpoolctl import threadpool_limits
+    return threadpool_limits(1)
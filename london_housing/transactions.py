@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DEFAULT_BIN_LABELS = {
+    3: ["small", "medium", "large"],
+    4: ["very_low", "low", "medium", "high"],
+}
+
+
+class TransactionMatrix:
+    # CSR layout: the items of transaction t are indices[indptr[t]:indptr[t + 1]]
+    def __init__(self, indptr, indices, item_names):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.item_names = list(item_names)
+
+    @classmethod
+    def from_lists(cls, transactions):
+        item_ids = {}
+        indices = [item_ids.setdefault(item, len(item_ids)) for t in transactions for item in t]
+        indptr = np.zeros(len(transactions) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in transactions], out=indptr[1:])
+        return cls(indptr, indices, list(item_ids))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_items(self):
+        return len(self.item_names)
+
+    def row_ids(self):
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+
+    def item_counts(self):
+        return np.bincount(self.indices, minlength=self.n_items)
+
+    def tidsets(self):
+        # One Python int bitmap per item (bit t set if transaction t holds the item)
+        order = np.argsort(self.indices, kind="stable")
+        rows = self.row_ids()[order]
+        bounds = np.searchsorted(self.indices[order], np.arange(self.n_items + 1))
+        tidsets = {}
+        for item in range(self.n_items):
+            bits = np.zeros(len(self), dtype=bool)
+            bits[rows[bounds[item]:bounds[item + 1]]] = True
+            tidsets[item] = int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+        return tidsets
+
+    def unique_rows(self):
+        # Distinct transactions with their multiplicity, padded with -1
+        lengths = np.diff(self.indptr)
+        padded = np.full((len(self), max(int(lengths.max(initial=0)), 1)), -1, dtype=np.int32)
+        positions = np.arange(len(self.indices)) - np.repeat(self.indptr[:-1], lengths)
+        padded[self.row_ids(), positions] = self.indices
+        return np.unique(padded, axis=0, return_counts=True)
+
+    def to_lists(self, names=False):
+        rows = np.split(self.indices, self.indptr[1:-1])
+        if names:
+            return [[self.item_names[item] for item in row] for row in rows]
+        return [row.tolist() for row in rows]
+
+    def to_sparse(self):
+        data = np.ones(len(self.indices), dtype=bool)
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(len(self), self.n_items))
+
+    def to_sparse_frame(self):
+        # Sparse boolean frame accepted by mlxtend's apriori/fpgrowth
+        return pd.DataFrame.sparse.from_spmatrix(self.to_sparse(), columns=self.item_names)
+
+    def to_dense(self):
+        return pd.DataFrame(self.to_sparse().toarray(), columns=self.item_names)
+
+
+class TransactionEncoder:
+    def __init__(self, numeric_columns=(), categorical_columns=(), n_bins=4, strategy="equal_width",
+                 edges=None, labels=None, include_lowest=True, fill_values=None):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        # n_bins, edges and labels may be given per column as dicts
+        self.n_bins = n_bins
+        # "equal_width": min..max, "zero_to_max": 0..max as in the notebooks, "quantile"
+        self.strategy = strategy
+        self.edges = dict(edges or {})
+        self.labels = dict(labels or {})
+        # include_lowest=False leaves a value on the first edge without an item, as pd.cut does
+        self.include_lowest = include_lowest
+        # Per-column value binned in place of NaN; NaN is otherwise no item
+        self.fill_values = dict(fill_values or {})
+        self.edges_ = None
+        self.categories_ = None
+        self.item_names_ = None
+
+    def _bins_for(self, column):
+        return self.n_bins[column] if isinstance(self.n_bins, dict) else self.n_bins
+
+    def fit(self, df):
+        self.edges_ = {
+            column: np.asarray(self.edges[column], dtype=np.float64)
+            for column in self.numeric_columns if column in self.edges
+        }
+
+        # Edges of all remaining numeric columns come from block-wide reductions
+        binned = [column for column in self.numeric_columns if column not in self.edges]
+        if binned:
+            values = df[binned].to_numpy(dtype=np.float64)
+            n_bins = np.array([self._bins_for(column) for column in binned])
+            if self.strategy == "quantile":
+                for count in np.unique(n_bins):
+                    selected = np.flatnonzero(n_bins == count)
+                    quantiles = np.nanquantile(values[:, selected], np.linspace(0, 1, count + 1), axis=0)
+                    for j, i in enumerate(selected):
+                        self.edges_[binned[i]] = quantiles[:, j]
+            else:
+                highs = np.nanmax(values, axis=0)
+                if self.strategy == "equal_width":
+                    lows = np.nanmin(values, axis=0)
+                else:
+                    lows = np.zeros(len(binned))
+                for i, column in enumerate(binned):
+                    self.edges_[column] = lows[i] + (highs[i] - lows[i]) * np.linspace(0, 1, n_bins[i] + 1)
+
+        self.categories_ = {}
+        for column in self.categorical_columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self.categories_[column] = list(values.cat.categories)
+            else:
+                self.categories_[column] = sorted(values.dropna().unique())
+
+        self.item_names_ = []
+        for column in self.numeric_columns:
+            n_bins = len(self.edges_[column]) - 1
+            labels = self.labels.get(column) or DEFAULT_BIN_LABELS.get(n_bins) or [f"bin_{i}" for i in range(n_bins)]
+            self.item_names_ += [f"{column}_{label}" for label in labels]
+        for column in self.categorical_columns:
+            self.item_names_ += [f"{column}_{_format_value(value)}" for value in self.categories_[column]]
+        return self
+
+    def transform(self, df):
+        codes = []
+        offset = 0
+        values = df[self.numeric_columns].to_numpy(dtype=np.float64)
+        for i, column in enumerate(self.numeric_columns):
+            edges = self.edges_[column]
+            column_values = values[:, i]
+            if column in self.fill_values:
+                column_values = np.where(np.isnan(column_values), self.fill_values[column], column_values)
+            # Right-closed bins like pd.cut; out of range or NaN is no item
+            column_codes = np.searchsorted(edges[1:-1], column_values, side="left")
+            above_lowest = column_values >= edges[0] if self.include_lowest else column_values > edges[0]
+            outside = ~(above_lowest & (column_values <= edges[-1]))
+            codes.append(np.where(outside, -1, column_codes + offset))
+            offset += len(edges) - 1
+        for column in self.categorical_columns:
+            categories = self.categories_[column]
+            column_codes = pd.Categorical(df[column], categories=categories).codes.astype(np.int64)
+            codes.append(np.where(column_codes >= 0, column_codes + offset, -1))
+            offset += len(categories)
+
+        codes = np.column_stack(codes) if codes else np.empty((len(df), 0), dtype=np.int64)
+        present = codes >= 0
+        indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        return TransactionMatrix(indptr, codes[present], self.item_names_)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+def _format_value(value):
+    # 3.0 bedrooms -> "3", category strings unchanged
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
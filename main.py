@@ -1,20 +1,306 @@
+import argparse
+import contextlib
 import json
 import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+ALGORITHMS = ["kmeans", "agnes", "dbscan", "geo", "consensus", "eclat", "fp_growth"]
+
+DEFAULT_CONFIG = {
+    "data": "final_clean_data.json",
+    "output_dir": "results",
+    "jobs": None,
+    "trace": False,
+    # Silhouette/Davies-Bouldin/Calinski-Harabasz and pairwise ARI of the clustering jobs
+    "evaluate": True,
+    "algorithms": [],
+    # profile: per-cluster statistics of the labelled rows (profiling.py) in profile.json
+    "kmeans": {"n_clusters": 5, "streaming": False, "chunk_size": 20000, "sample_size": 10000,
+               "sweep_jobs": None, "profile": True},
+    "agnes": {"n_clusters": 4, "linkage": "ward", "sample_size": 10000,
+              "connectivity_neighbors": None, "birch_threshold": None, "profile": True},
+    "dbscan": {"eps": None, "min_samples": 10, "sample_size": None, "profile": True},
+    "geo": {"eps_km": 0.3, "min_samples": 20, "price_clusters": None, "sample_size": None, "profile": True},
+    # Seeds/subsamples of one method combined into stable labels (consensus.py)
+    "consensus": {"method": "kmeans", "n_clusters": 5, "runs": 20, "sample_fraction": 0.8,
+                  "max_sample_size": None, "threshold": 0.5, "eps": 0.4, "min_samples": 10,
+                  "jobs": None, "profile": True},
+    "eclat": {"min_support": 0.01, "min_confidence": 0.5, "use_diffsets": False},
+    "fp_growth": {"min_support": 0.05, "min_confidence": 0.7},
+}
+
 
 def inspect_json_data(json_file_path):
     with open(json_file_path, mode='r', encoding='utf-8') as json_file:
         data = json.load(json_file)
-    
+
     if not data:
         print("No data found in the JSON file.")
         return
-    
+
     print(f"Total number of data entries: {len(data)}")
 
-# Example usage
-if __name__ == "__main__":
+
+def load_config(config_path=None):
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    if config_path:
+        with open(config_path, mode='r', encoding='utf-8') as config_file:
+            user_config = json.load(config_file)
+        for key, value in user_config.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+
+def _write_labels(path, labels, index):
+    import pandas as pd
+    pd.DataFrame({"row": index, "cluster": labels}).to_csv(path, index=False)
+
+def _write_profile(data_path, labels, index, output_dir, n_jobs):
+    from london_housing.profiling import profile_clusters, write_report
+    report = profile_clusters(data_path, labels, rows=index, n_jobs=n_jobs)
+    write_report(report, os.path.join(output_dir, "profile.json"))
+
+def _write_rules(output_dir, frequent_itemsets, rules):
+    import pandas as pd
+    itemsets = pd.DataFrame(
+        [(" + ".join(sorted(map(str, itemset))), count) for itemset, count in frequent_itemsets.items()],
+        columns=["itemset", "count"],
+    ).sort_values("count", ascending=False)
+    itemsets.to_csv(os.path.join(output_dir, "frequent_itemsets.csv"), index=False)
+    rules = rules.assign(
+        antecedents=rules["antecedents"].map(lambda items: " + ".join(sorted(map(str, items)))),
+        consequents=rules["consequents"].map(lambda items: " + ".join(sorted(map(str, items)))),
+    )
+    rules.to_csv(os.path.join(output_dir, "rules.csv"), index=False)
+
+
+def run_kmeans(data_path, params, output_dir, n_jobs):
+    from london_housing.kmeans import OptimizedKMeansClustering
+
+    kmeans = OptimizedKMeansClustering(n_clusters=params["n_clusters"])
+    if params["streaming"]:
+        labels = kmeans.fit_streaming(data_path, chunk_size=params["chunk_size"])
+    else:
+        kmeans.load_json_data(data_path)
+        kmeans.preprocess_data()
+        labels = kmeans.reduce_and_cluster(n_jobs=params["sweep_jobs"] or n_jobs, sample_size=params["sample_size"])
+        kmeans.model_selection.to_csv(os.path.join(output_dir, "model_selection.csv"))
+    kmeans.save(os.path.join(output_dir, "model.pkl"))
+    kmeans.export(os.path.join(output_dir, "model.npz"))
+
+    _write_labels(os.path.join(output_dir, "labels.csv"), labels, kmeans.sample_index)
+    if params["profile"]:
+        _write_profile(data_path, labels, kmeans.sample_index, output_dir, n_jobs)
+    kmeans.cluster_summary.to_csv(os.path.join(output_dir, "cluster_summary.csv"))
+    return {"rows": len(labels)}
+
+def run_agnes(data_path, params, output_dir, n_jobs):
+    from london_housing.agnes import AGNESClustering
+
+    agnes = AGNESClustering(n_clusters=params["n_clusters"], linkage=params["linkage"],
+                            connectivity_neighbors=params["connectivity_neighbors"],
+                            birch_threshold=params["birch_threshold"])
+    agnes.load_json_data(data_path)
+    agnes.preprocess_data()
+    labels = agnes.cluster_and_visualize(sample_size=params["sample_size"])
+
+    _write_labels(os.path.join(output_dir, "labels.csv"), labels, agnes.sample_index)
+    if params["profile"]:
+        _write_profile(data_path, labels, agnes.sample_index, output_dir, n_jobs)
+    agnes.cluster_summary.to_csv(os.path.join(output_dir, "cluster_summary.csv"))
+    return {"rows": len(labels)}
+
+def run_dbscan(data_path, params, output_dir, n_jobs):
+    from london_housing.dbscan import DBSCANClustering
+
+    dbscan = DBSCANClustering(eps=params["eps"], min_samples=params["min_samples"])
+    labels = dbscan.cluster_and_visualize(data_path, sample_size=params["sample_size"])
+
+    _write_labels(os.path.join(output_dir, "labels.csv"), labels, dbscan.sample_index)
+    if params["profile"]:
+        _write_profile(data_path, labels, dbscan.sample_index, output_dir, n_jobs)
+    dbscan.cluster_summary.to_csv(os.path.join(output_dir, "cluster_summary.csv"))
+    return {"rows": len(labels)}
+
+def run_geo(data_path, params, output_dir, n_jobs):
+    from london_housing.geo_clustering import GeoClustering
+
+    geo = GeoClustering(eps_km=params["eps_km"], min_samples=params["min_samples"],
+                        price_clusters=params["price_clusters"])
+    labels = geo.cluster_and_visualize(data_path, sample_size=params["sample_size"])
+
+    _write_labels(os.path.join(output_dir, "labels.csv"), labels, geo.sample_index)
+    if params["profile"]:
+        _write_profile(data_path, labels, geo.sample_index, output_dir, n_jobs)
+    geo.cluster_summary.to_csv(os.path.join(output_dir, "cluster_summary.csv"))
+    geo.hotspots.to_csv(os.path.join(output_dir, "hotspots.csv"))
+    return {"rows": len(labels)}
+
+def run_consensus(data_path, params, output_dir, n_jobs):
+    import numpy as np
+    import pandas as pd
+    from london_housing.consensus import ConsensusClustering, feature_space
+
+    if params["method"] == "kmeans":
+        method_params = {"n_clusters": params["n_clusters"], "batch_size": 2000}
+    elif params["method"] == "dbscan":
+        method_params = {"eps": params["eps"], "min_samples": params["min_samples"]}
+    else:
+        method_params = {"n_clusters": params["n_clusters"], "linkage": "ward"}
+    consensus = ConsensusClustering(params["method"], n_runs=params["runs"],
+                                    sample_fraction=params["sample_fraction"],
+                                    max_sample_size=params["max_sample_size"], threshold=params["threshold"],
+                                    n_jobs=params["jobs"] or n_jobs,
+                                    **method_params)
+    labels = consensus.fit(feature_space(data_path))
+    index = np.arange(len(labels))
+
+    _write_labels(os.path.join(output_dir, "labels.csv"), labels, index)
+    pd.DataFrame({"row": index, "stability": consensus.stability_,
+                  "edge_stability": consensus.edge_stability_}).to_csv(
+        os.path.join(output_dir, "stability.csv"), index=False)
+    if params["profile"]:
+        _write_profile(data_path, labels, index, output_dir, n_jobs)
+    consensus.summary().to_csv(os.path.join(output_dir, "cluster_summary.csv"))
+    return {"rows": len(labels), "mean_stability": float(np.nanmean(consensus.stability_))}
+
+def run_eclat(data_path, params, output_dir, n_jobs):
+    from london_housing.eclat import Eclat
+
+    eclat = Eclat(data_path, params["min_support"], use_diffsets=params["use_diffsets"])
+    frequent_itemsets, transactions = eclat.run()
+    rules = eclat.generate_rules(frequent_itemsets, transactions, params["min_confidence"])
+    eclat.plot_top_frequent_itemsets(frequent_itemsets)
+
+    _write_rules(output_dir, frequent_itemsets, rules)
+    return {"itemsets": len(frequent_itemsets), "rules": len(rules)}
+
+def run_fp_growth(data_path, params, output_dir, n_jobs):
+    from london_housing.fp_growth import FPGrowth, load_transactions
+
+    transactions = load_transactions(data_path)
+    fp_growth = FPGrowth(params["min_support"])
+    frequent_itemsets = fp_growth.get_frequent_itemsets(transactions)
+    rules = fp_growth.generate_rules(frequent_itemsets, transactions, params["min_confidence"])
+
+    _write_rules(output_dir, frequent_itemsets, rules)
+    return {"itemsets": len(frequent_itemsets), "rules": len(rules)}
+
+JOBS = {
+    "kmeans": run_kmeans,
+    "agnes": run_agnes,
+    "dbscan": run_dbscan,
+    "geo": run_geo,
+    "consensus": run_consensus,
+    "eclat": run_eclat,
+    "fp_growth": run_fp_growth,
+}
+
+
+def run_job(name, data_path, params, output_dir, trace=False, n_jobs=1):
+    # Runs in a worker process: non-interactive backend, figures and log go to output_dir/name
+    # MPLBACKEND instead of matplotlib.use(): jobs that never plot never import matplotlib
+    os.environ["MPLBACKEND"] = "Agg"
+    from threadpoolctl import threadpool_limits
+    from london_housing.plotting import set_output_dir
+
+    job_dir = os.path.join(output_dir, name)
+    set_output_dir(job_dir)
+    if trace:
+        from london_housing.instrumentation import enable
+        trace_path = os.path.join(job_dir, "trace.jsonl")
+        if os.path.exists(trace_path):
+            os.remove(trace_path)
+        enable(trace_path)
+    result = {"algorithm": name, "output_dir": job_dir}
+    start = time.perf_counter()
+    with open(os.path.join(job_dir, "log.txt"), mode='w', encoding='utf-8') as log_file:
+        with contextlib.redirect_stdout(log_file), contextlib.redirect_stderr(log_file):
+            try:
+                # n_jobs is this job's share of the cores: its own pools and BLAS/OpenMP stay within it
+                with threadpool_limits(n_jobs):
+                    result.update(JOBS[name](data_path, params, job_dir, n_jobs))
+                result["status"] = "ok"
+            except Exception as error:
+                traceback.print_exc()
+                result["status"] = "failed"
+                result["error"] = repr(error)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def run_batch(config):
+    output_dir = config["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    data_path = os.path.abspath(config["data"])
+
+    # Build the shared column cache once up front instead of racing in every job
+    from london_housing.data_cache import ensure_cache
+    ensure_cache(data_path)
+
+    # The cores are split between the concurrent jobs, so nested pools (model selection,
+    # consensus runs, profiling) never start more workers than there are cores in total
+    algorithms = config["algorithms"]
+    n_workers = min(config["jobs"] or len(algorithms), len(algorithms))
+    n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {
+            name: pool.submit(run_job, name, data_path, config[name], output_dir, config["trace"], n_jobs)
+            for name in algorithms
+        }
+        results = [futures[name].result() for name in algorithms]
+
+    for result in results:
+        print(f"{result['algorithm']:<10} {result['status']:<7} {result['seconds']:>9.2f}s  {result['output_dir']}")
+
+    label_files = {
+        result["algorithm"]: os.path.join(result["output_dir"], "labels.csv")
+        for result in results
+        if result["status"] == "ok" and os.path.exists(os.path.join(result["output_dir"], "labels.csv"))
+    }
+    if config["evaluate"] and label_files:
+        from london_housing.evaluation import evaluate_runs, metrics_frame
+        with contextlib.redirect_stdout(None):
+            evaluation = evaluate_runs(data_path, label_files)
+        with open(os.path.join(output_dir, "evaluation.json"), mode='w', encoding='utf-8') as evaluation_file:
+            json.dump(evaluation, evaluation_file, indent=4)
+        print(metrics_frame(evaluation).to_string())
+    with open(os.path.join(output_dir, "summary.json"), mode='w', encoding='utf-8') as summary_file:
+        json.dump({"config": config, "results": results}, summary_file, indent=4)
+    return results
+
+
+def main(argv=None):
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    final_json_file = os.path.join(current_dir, 'final_clean_data.json')
-    
-    print("Final Cleaned Data:")
-    inspect_json_data(final_json_file)
+    parser = argparse.ArgumentParser(description="Run the clustering and rule mining analyses headlessly.")
+    parser.add_argument("--config", help="JSON file overriding DEFAULT_CONFIG (per-algorithm sections are merged)")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, help="analyses to run")
+    parser.add_argument("--data", help="cleaned data file (default: final_clean_data.json)")
+    parser.add_argument("--output-dir", help="directory for labels, summaries and figures")
+    parser.add_argument("--jobs", type=int, help="number of analyses run concurrently")
+    parser.add_argument("--trace", action="store_true", default=None,
+                        help="write per-stage timings and memory to <output-dir>/<algorithm>/trace.jsonl")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    for key in ("algorithms", "data", "output_dir", "jobs", "trace"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    if not os.path.isabs(config["data"]) and not os.path.exists(config["data"]):
+        config["data"] = os.path.join(current_dir, config["data"])
+
+    if not config["algorithms"]:
+        print("Final Cleaned Data:")
+        inspect_json_data(config["data"])
+        return 0
+
+    results = run_batch(config)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
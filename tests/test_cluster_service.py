@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import write_raw_csv
+from london_housing.cluster_service import ClusterModel, serve_stdio
+from london_housing.features import FeatureMatrixBuilder, to_dense
+from london_housing.ingest import ingest_csv
+from london_housing.kmeans import OptimizedKMeansClustering
+
+
+@pytest.fixture(scope='module')
+def frame(tmp_path_factory):
+    path = write_raw_csv(str(tmp_path_factory.mktemp('service') / 'raw.csv'), 3000, seed=3)
+    return ingest_csv(path, n_jobs=1)[0]
+
+
+def fitted_kmeans(frame, sparse_output):
+    from sklearn.decomposition import PCA
+    kmeans = OptimizedKMeansClustering(n_clusters=4)
+    kmeans.builder = FeatureMatrixBuilder(sparse_output=sparse_output)
+    scaled = to_dense(kmeans.builder.scale(kmeans.builder.fit_transform(frame)))
+    kmeans.pca = PCA(n_components=5).fit(scaled)
+    kmeans.model.fit(kmeans.pca.transform(scaled))
+    return kmeans
+
+
+def listings(frame):
+    # Rows as the service receives them: JSON objects with null for missing values
+    return json.loads(frame.to_json(orient='records'))
+
+
+@pytest.mark.parametrize('sparse_output', [False, True])
+def test_service_matches_pipeline_predict(frame, tmp_path, sparse_output):
+    kmeans = fitted_kmeans(frame, sparse_output)
+    path = str(tmp_path / 'model.npz')
+    kmeans.export(path)
+    model = ClusterModel.load(path)
+
+    labels, distances = model.predict(listings(frame))
+    np.testing.assert_array_equal(labels, kmeans.predict(frame))
+    reduced = kmeans.transform(frame)[1]
+    np.testing.assert_allclose(distances, np.linalg.norm(reduced - kmeans.model.cluster_centers_[labels], axis=1),
+                               rtol=1e-6, atol=1e-6)
+
+
+def test_stdio_answers_one_line_per_request(frame):
+    kmeans = fitted_kmeans(frame, 'auto')
+    model = ClusterModel.from_pipeline(kmeans)
+    rows = listings(frame.iloc[:5])
+    stdin = io.StringIO(json.dumps(rows[0]) + '\n\n' + json.dumps(rows) + '\nnot json\n')
+    stdout = io.StringIO()
+    serve_stdio(model, stdin, stdout)
+
+    single, batch, error = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    expected = kmeans.predict(frame.iloc[:5]).tolist()
+    assert single['cluster'] == expected[0]
+    assert batch['cluster'] == expected
+    assert 'error' in error
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from london_housing.features import FeatureMatrixBuilder, to_dense
+
+CATEGORICAL = ['tenure', 'propertyType']
+
+
+def listings(n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    change = rng.normal(0, 5, n_rows)
+    change[rng.random(n_rows) < 0.2] = 0
+    area = rng.uniform(20, 200, n_rows)
+    area[rng.random(n_rows) < 0.1] = 0
+    return pd.DataFrame({
+        'floorAreaSqM': area,
+        'saleEstimate_valueChange.percentageChange': change,
+        'tenure': pd.Categorical(rng.choice(['Freehold', 'Leasehold'], n_rows)),
+        'propertyType': pd.Categorical(rng.choice([f'type_{i}' for i in range(20)], n_rows)),
+    })
+
+
+def test_sparse_scale_matches_dense():
+    df = listings()
+    dense = FeatureMatrixBuilder(CATEGORICAL, sparse_output=False)
+    sparse = FeatureMatrixBuilder(CATEGORICAL, sparse_output=True)
+    dense_scaled = dense.scale(dense.fit_transform(df))
+    sparse_matrix = sparse.fit_transform(df)
+    assert df['saleEstimate_valueChange.percentageChange'].min() < 0
+    np.testing.assert_allclose(to_dense(sparse.scale(sparse_matrix)), dense_scaled, atol=1e-6)
+
+    # Zeros the CSR matrix does not store still scale to the column's min_
+    sparse_matrix.eliminate_zeros()
+    np.testing.assert_allclose(to_dense(sparse.scale(sparse_matrix)), dense_scaled, atol=1e-6)
+
+
+def test_sparse_frame_keeps_numeric_zeros():
+    df = listings()
+    builder = FeatureMatrixBuilder(CATEGORICAL, sparse_output=True)
+    matrix = builder.fit_transform(df)
+    frame = builder.to_frame(matrix)
+    assert not isinstance(frame['floorAreaSqM'].dtype, pd.SparseDtype)
+    assert isinstance(frame['tenure_Freehold'].dtype, pd.SparseDtype)
+    np.testing.assert_allclose(frame.to_numpy(dtype=np.float32), to_dense(matrix))
@@ -0,0 +1,72 @@
+import csv
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_raw_data
+from london_housing.features import FeatureMatrixBuilder, to_dense
+from london_housing.incremental import IncrementalClusterer, row_key
+from london_housing.ingest import ingest_csv
+from london_housing.kmeans import OptimizedKMeansClustering
+
+
+@pytest.fixture(scope='module')
+def raw(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('incremental')
+    df = generate_raw_data(3000, seed=2).astype(object)
+    df.loc[10, 'bathrooms'] = 'x'
+
+    # The second delta overlaps the first and edits some rows, one of them into a reject
+    edited = df.copy()
+    edited.loc[1200:1210, 'floorAreaSqM'] = 75.0
+    edited.loc[1211, 'floorAreaSqM'] = np.nan
+    paths = {'delta_1': df.iloc[:1500], 'delta_2': edited.iloc[1000:], 'full': edited}
+    for name, part in paths.items():
+        part.to_csv(directory / f'{name}.csv', index=False)
+    paths = {name: str(directory / f'{name}.csv') for name in paths}
+
+    kmeans = OptimizedKMeansClustering(n_clusters=3)
+    frame, _ = ingest_csv(paths['full'], n_jobs=1)
+    kmeans.builder = FeatureMatrixBuilder()
+    scaled = to_dense(kmeans.builder.scale(kmeans.builder.fit_transform(frame)))
+    from sklearn.decomposition import PCA
+    kmeans.pca = PCA(n_components=3).fit(scaled)
+    kmeans.model.fit(kmeans.pca.transform(scaled))
+    paths['model'] = str(directory / 'model.pkl')
+    kmeans.save(paths['model'])
+    paths['directory'] = directory
+    return paths
+
+
+def test_deltas_match_full_rebuild(raw):
+    incremental = IncrementalClusterer(raw['model'], raw['directory'] / 'deltas')
+    for name in ('delta_1', 'delta_2'):
+        incremental.process_delta(raw[name])
+    state = incremental.state
+
+    # Full rebuild: ingest the whole file, then encode and assign every kept row
+    kmeans = OptimizedKMeansClustering.load(raw['model'])
+    frame, rejected = ingest_csv(raw['full'], n_jobs=1)
+    matrix, reduced = kmeans.transform(frame)
+    with open(raw['full'], encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    rejected_lines = set(rejected['line'])
+    keys = np.array([row_key(row) for line, row in enumerate(rows, start=2) if line not in rejected_lines],
+                    dtype=np.uint64)
+
+    positions = state.lookup(keys)
+    assert (positions >= 0).all()
+    np.testing.assert_array_equal(state.labels[positions], kmeans.model.predict(reduced))
+    np.testing.assert_allclose(state.features[positions], to_dense(matrix))
+    # Rejected rows are remembered with cluster -1, and nothing else is in the manifest
+    assert len(state) == len(rows)
+    assert (state.labels == -1).sum() == rejected['line'].nunique()
+
+    one_shot = IncrementalClusterer(raw['model'], raw['directory'] / 'full')
+    one_shot.process_delta(raw['full'])
+    pd.testing.assert_frame_equal(state.summary(), one_shot.state.summary())
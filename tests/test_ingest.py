@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import generate_raw_data
+from london_housing import json_convert
+from london_housing.data_cache import read_source
+from london_housing.ingest import ingest_csv, rejected_frame
+
+
+@pytest.fixture(scope='module')
+def raw_csv(tmp_path_factory):
+    df = generate_raw_data(5000, seed=1).astype(object)
+    df.loc[5, 'floorAreaSqM'] = 'abc'
+    df.loc[7, 'bathrooms'] = 'x'
+    df.loc[9, ['floorAreaSqM', 'rentEstimate_lowerPrice']] = np.nan
+    path = tmp_path_factory.mktemp('ingest') / 'raw.csv'
+    df.to_csv(path, index=False)
+    with open(path, mode='a', encoding='utf-8') as f:
+        f.write('1,2,3\n')
+    return str(path)
+
+
+@pytest.mark.parametrize('n_jobs', [1, None])
+def test_ingest_matches_row_stages(raw_csv, tmp_path, n_jobs):
+    rejected = []
+    json_path = str(tmp_path / 'clean.json')
+    count = json_convert.run_pipeline(json_convert.read_csv_rows(raw_csv, rejected),
+                                      json_convert.cleaning_stages(rejected=rejected), json_file_path=json_path)
+
+    frame, ingest_rejected = ingest_csv(raw_csv, n_jobs=n_jobs, chunk_size=100_000)
+    assert len(frame) == count
+    pd.testing.assert_frame_equal(frame, read_source(json_path))
+    pd.testing.assert_frame_equal(ingest_rejected.astype(str), rejected_frame(rejected).astype(str))
+    reasons = set(zip(ingest_rejected['column'].fillna(''), ingest_rejected['reason']))
+    assert ('floorAreaSqM', 'not a number') in reasons
+    assert ('bathrooms', 'not a number') in reasons
+    assert ('', 'expected 28 fields, got 3') in reasons
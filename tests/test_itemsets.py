@@ -0,0 +1,76 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from london_housing.eclat import Eclat
+from london_housing.fp_growth import FPGrowth, transaction_encoder
+
+
+def brute_force_itemsets(transactions, min_support, max_length=None):
+    # Support count of every itemset that occurs in some transaction, kept when frequent
+    counts = {}
+    for transaction in transactions:
+        items = sorted(set(transaction))
+        for length in range(1, (max_length or len(items)) + 1):
+            for itemset in combinations(items, length):
+                counts[frozenset(itemset)] = counts.get(frozenset(itemset), 0) + 1
+    min_count = min_support * len(transactions)
+    return {itemset: count for itemset, count in counts.items() if count >= min_count}
+
+
+def random_transactions(n_transactions=300, n_items=8, seed=0):
+    rng = np.random.default_rng(seed)
+    weights = rng.uniform(0.1, 0.7, n_items)
+    return [[f'item_{i}' for i in np.flatnonzero(rng.random(n_items) < weights)]
+            for _ in range(n_transactions)]
+
+
+@pytest.mark.parametrize('min_support', [0.02, 0.1, 0.3])
+@pytest.mark.parametrize('max_length', [None, 2])
+def test_fp_growth_matches_brute_force(min_support, max_length):
+    transactions = random_transactions()
+    expected = brute_force_itemsets(transactions, min_support, max_length)
+    assert FPGrowth(min_support, max_length).get_frequent_itemsets(transactions) == expected
+
+
+@pytest.mark.parametrize('min_support', [0.02, 0.1, 0.3])
+@pytest.mark.parametrize('max_length', [None, 2])
+@pytest.mark.parametrize('use_diffsets', [False, True])
+def test_eclat_matches_brute_force(min_support, max_length, use_diffsets):
+    transactions = random_transactions(seed=1)
+    expected = brute_force_itemsets(transactions, min_support, max_length)
+    eclat = Eclat(None, min_support, max_length=max_length, use_diffsets=use_diffsets)
+    assert eclat.get_frequent_itemsets(transactions) == expected
+
+
+def test_fp_growth_ranges_match_notebook_bins():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'saleEstimate_currentPrice': rng.uniform(1e5, 2e6, 500),
+        'floorAreaSqM': rng.uniform(20, 300, 500),
+        'saleEstimate_valueChange.percentageChange': rng.normal(0, 5, 500),
+        'tenure': pd.Categorical(rng.choice(['Freehold', 'Leasehold'], 500)),
+        'propertyType': pd.Categorical(rng.choice(['Flat', 'House'], 500)),
+    })
+    df.loc[:4, 'floorAreaSqM'] = 0
+    df.loc[5:9, 'saleEstimate_valueChange.percentageChange'] = np.nan
+    transactions = transaction_encoder().fit_transform(df).to_lists(names=True)
+
+    # Price and area ranges are the notebook's pd.cut bins on 0..max
+    max_price, max_area = df['saleEstimate_currentPrice'].max(), df['floorAreaSqM'].max()
+    price = pd.cut(df['saleEstimate_currentPrice'], [0, max_price / 4, max_price / 2, 3 * max_price / 4, max_price],
+                   labels=['very_low', 'low', 'medium', 'high'])
+    area = pd.cut(df['floorAreaSqM'], [0, max_area / 3, 2 * max_area / 3, max_area],
+                  labels=['small', 'medium', 'large'])
+    # The sign is taken on the raw change, missing counted as negative
+    sign = np.where(df['saleEstimate_valueChange.percentageChange'] > 0, 'positive', 'negative')
+    for i, items in enumerate(transactions):
+        expected = {f'saleEstimate_valueChange.percentageChange_{sign[i]}',
+                    f"tenure_{df['tenure'][i]}", f"propertyType_{df['propertyType'][i]}"}
+        if pd.notna(price[i]):
+            expected.add(f'saleEstimate_currentPrice_{price[i]}')
+        if pd.notna(area[i]):
+            expected.add(f'floorAreaSqM_{area[i]}')
+        assert set(items) == expected
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from benchmark import HEAVY_PACKAGES, LAZY_MODULES
+
+
+def imported_packages(module):
+    # Top-level packages in sys.modules after importing module in a fresh interpreter
+    code = f"import sys, {module}; print(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    return set(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                              check=True, cwd=PROJECT_DIR).stdout.split())
+
+
+@pytest.mark.parametrize('module', sorted(LAZY_MODULES))
+def test_heavy_packages_are_imported_lazily(module):
+    heavy = sorted(imported_packages(module).intersection(HEAVY_PACKAGES))
+    assert not heavy, f"{module} imports {', '.join(heavy)} at import time"
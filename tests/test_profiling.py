@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from london_housing.profiling import ProfileAccumulator, histogram_edges, profile_clusters, summary_frame
+
+
+def chunk(seed, n_rows=400, n_clusters=3):
+    rng = np.random.default_rng(seed)
+    numeric = rng.normal(seed, 1 + seed, (n_rows, 2))
+    numeric[rng.random(numeric.shape) < 0.1] = np.nan
+    categorical = [rng.integers(-1, 4, n_rows)]
+    return rng.integers(0, n_clusters, n_rows), numeric, categorical
+
+
+@pytest.fixture
+def edges():
+    values = np.concatenate([chunk(seed)[1] for seed in range(3)])
+    return [histogram_edges(column, n_bins=32) for column in values.T]
+
+
+def accumulate(edges, seeds):
+    accumulator = ProfileAccumulator(3, edges, [4])
+    for seed in seeds:
+        accumulator.update(*chunk(seed))
+    return accumulator
+
+
+def assert_same(a, b):
+    for name in ('size', 'count', 'mean', 'm2', 'min', 'max'):
+        np.testing.assert_allclose(getattr(a, name), getattr(b, name), rtol=1e-12, atol=1e-9)
+    for name in ('histograms', 'bin_sums', 'categories'):
+        for x, y in zip(getattr(a, name), getattr(b, name)):
+            np.testing.assert_allclose(x, y)
+
+
+def test_merge_is_associative(edges):
+    left = accumulate(edges, [0]).merge(accumulate(edges, [1])).merge(accumulate(edges, [2]))
+    right = accumulate(edges, [0]).merge(accumulate(edges, [1]).merge(accumulate(edges, [2])))
+    assert_same(left, right)
+    assert_same(left, accumulate(edges, [0, 1, 2]))
+
+
+def test_merged_moments_match_numpy(edges):
+    merged = accumulate(edges, [0]).merge(accumulate(edges, [1]))
+    codes, numeric = zip(*[chunk(seed)[:2] for seed in range(2)])
+    codes, numeric = np.concatenate(codes), np.concatenate(numeric)
+    for cluster in range(3):
+        values = numeric[codes == cluster, 0]
+        values = values[~np.isnan(values)]
+        assert merged.count[cluster, 0] == len(values)
+        np.testing.assert_allclose(merged.mean[cluster, 0], values.mean())
+        np.testing.assert_allclose(merged.m2[cluster, 0] / (len(values) - 1), values.var(ddof=1))
+
+
+def test_parallel_profile_matches_serial(tmp_path):
+    rng = np.random.default_rng(0)
+    n_rows = 3000
+    records = pd.DataFrame({
+        'floorAreaSqM': rng.uniform(20, 200, n_rows),
+        'bedrooms': rng.integers(0, 6, n_rows).astype(float),
+        'tenure': rng.choice(['Freehold', 'Leasehold'], n_rows),
+    }).to_dict(orient='records')
+    source = tmp_path / 'data.json'
+    source.write_text(json.dumps(records), encoding='utf-8')
+    labels = rng.integers(0, 4, n_rows)
+
+    serial = profile_clusters(str(source), labels, chunk_size=500, n_jobs=1)
+    parallel = profile_clusters(str(source), labels, chunk_size=500, n_jobs=2)
+    for statistic in ('mean', 'std', 'min', 'max'):
+        pd.testing.assert_frame_equal(summary_frame(serial, statistic), summary_frame(parallel, statistic))
+    assert [c['categorical'] for c in serial['clusters']] == [c['categorical'] for c in parallel['clusters']]
+    expected = pd.DataFrame(records).assign(Cluster=labels).groupby('Cluster')[['floorAreaSqM', 'bedrooms']].mean()
+    pd.testing.assert_frame_equal(summary_frame(serial), expected, check_names=False)